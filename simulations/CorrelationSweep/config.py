@@ -51,25 +51,85 @@ CORRELATION_VALUES = [
     0.1, 0.25, 0.4, 0.5, 0.6, 0.75, 0.9, 1.0
 ]
 
+# Correlated initialization
+# 'anchor': App.jsx scheme, one random anchor feature per node and the other
+#   spectrum features sampled given the anchor state
+# 'copula': Gaussian copula with the correlation between every pair of spectrum
+#   features, discretized to equally likely states (vectorized over all nodes)
+CORRELATION_MODEL = 'anchor'
+
 # MAXIMUM runs per correlation for ultra-strong statistical significance
 RUNS_PER_CORRELATION = 500
 
 # Maximum simulation steps (safety limit to prevent infinite loops)
 MAX_STEPS = 1000000
 
+# Simulation engine
+# 'reference': one random (agent, neighbor) draw per step
+# 'rejection_free': n-fold way, samples only active pairs and adds the skipped
+#   failed steps as a geometric draw (same steps_to_convergence distribution;
+#   no gain for this study's 3 features with 5 states: within 20% of
+#   'reference' at every correlation)
+# 'jit': the reference loop compiled with Numba (pip install numba); same
+#   steps_to_convergence distribution, falls back to 'reference' without Numba
+ENGINE = 'reference'
+
+# Metrics computed for every run (see metrics.available_metrics());
+# steps_to_convergence is always recorded. Shared intermediates such as
+# culture codes are computed once per run and only when a selected metric
+# needs them. The standard plots use unique cultures, largest domain and
+# average distance; a sweep that only needs convergence time and consensus
+# probability can use ['global_consensus'].
+METRICS = ['unique_cultures', 'num_domains', 'largest_domain_size',
+           'largest_domain_percentage', 'avg_cultural_distance']
+
+# In-run time series (see recorder.py): unique cultures, largest culture share
+# and active-bond fraction sampled at TIME_SERIES_SAMPLES steps of every run
+# and saved to TIME_SERIES_FILE next to the raw data. 0 disables recording.
+# 'log' spacing resolves the fast early coarsening, 'linear' the late decay.
+# With SNAPSHOT_EVERY > 0, every SNAPSHOT_EVERY-th sample also stores the full
+# grid in a memory-mapped .npy file per run under SNAPSHOT_DIR.
+TIME_SERIES_SAMPLES = 0
+TIME_SERIES_SPACING = 'log'
+SNAPSHOT_EVERY = 0
+
+# Optional change-event log of every run (see event_log.py): one 16-byte record
+# per adoption plus a full-grid keyframe every EVENT_LOG_KEYFRAMES events,
+# written to EVENT_LOG_DIR. Much smaller than snapshots of every state; any
+# step can be replayed with event_log.EventLogReader. 0 disables the log.
+# With ENGINE = 'jit' a logged run takes the Python loop instead of the
+# compiled one: same distributions, but a seed gives a different run than
+# without the log (time series do not change runs).
+EVENT_LOG_KEYFRAMES = 0
+
 # Output paths
 RESULTS_DIR = "results"
 RAW_DATA_FILE = "results/raw_data.csv"
 AGGREGATED_DATA_FILE = "results/aggregated_data.csv"
 PLOTS_DIR = "results/plots"
+TIME_SERIES_FILE = "results/time_series.csv"
+SNAPSHOT_DIR = "results/snapshots"
+EVENT_LOG_DIR = "results/event_logs"
 
-# Random seed for reproducibility
+# Random seed for reproducibility. Every run gets its own seed spawned from
+# it (stored in the raw data), so results are the same for any number of
+# workers
 RANDOM_SEED = 42
 
 # Progress tracking
 SHOW_PROGRESS_BAR = True
-SAVE_INTERVAL = 3  # Save results every N correlation values
+
+# Results are appended to the raw data file as runs finish; written rows are
+# forced to disk after at most SYNC_SECONDS or SYNC_BYTES of output
+SYNC_SECONDS = 10
+SYNC_BYTES = 1048576
 
 # Parallelization
 USE_PARALLEL = True  # Enable parallel processing for faster execution
-# NUM_WORKERS will be automatically set to min(cpu_count(), RUNS_PER_CORRELATION)
+# NUM_WORKERS will be automatically set to min(cpu_count(), total number of runs)
+
+# Dispatch the runs with the longest predicted run time first (from the
+# steps_to_convergence of an earlier raw data file), so the sweep does not
+# end with a long single-core tail. Runs cost about the same at every
+# correlation, so without earlier data the sweep order is kept.
+LONGEST_FIRST = True
@@ -0,0 +1,169 @@
+"""
+Replay of single runs from the raw data
+
+Every row of raw_data.csv stores the parameters, run_id and seed of its run,
+so one run (e.g. an outlier that needed a million steps) can be re-executed
+exactly without repeating the sweep. The replay goes through the same code
+as the sweep with the current config.py, whose MAX_STEPS, ENGINE and
+EVENT_LOG_KEYFRAMES must match the sweep that wrote the row (an event log
+sends 'jit' runs through the Python loop); the replayed steps_to_convergence
+is checked against the stored one. A time-series recorder and a profiler can
+be attached to the replay.
+
+Usage:
+    python replay.py --correlation 0.5 --run-id 7
+    python replay.py --row 123 --time-series 200 --profile
+"""
+import argparse
+import cProfile
+import csv
+import math
+import os
+import pstats
+import sys
+
+# Add current directory and its parent, which holds the shared axelrod_core
+# package, to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from axelrod_core.event_log import DiscardedEventLog
+from axelrod_core.jit_kernel import NUMBA_AVAILABLE
+from axelrod_core.recorder import SPACINGS, TimeSeriesRecorder, sample_steps
+from data_collection import run_single_simulation, save_raw_data
+
+# Raw data columns that identify the parameter values of a run
+KEY_COLUMNS = ('correlation',)
+
+
+def find_run(run_id=None, row=None, filename=None, **params):
+    """
+    Raw data row of one run
+
+    Args:
+        run_id: Run index within its parameter values
+        row: Index of the data row instead (0 = first run in the file)
+        filename: Raw data file (default: config.RAW_DATA_FILE)
+        **params: Values of all KEY_COLUMNS, e.g. correlation=0.5
+
+    Returns:
+        Dictionary of the row's columns (values as strings)
+    """
+    if filename is None:
+        filename = config.RAW_DATA_FILE
+
+    with open(filename, newline='') as csvfile:
+        for idx, columns in enumerate(csv.DictReader(csvfile)):
+            if row is not None:
+                if idx == row:
+                    return columns
+            # Sweep values come from arithmetic (e.g. 0.30000000000000004)
+            elif (int(columns['run_id']) == run_id
+                  and all(math.isclose(float(columns[key]), float(params[key]), abs_tol=1e-9)
+                          for key in KEY_COLUMNS)):
+                return columns
+
+    selection = f"row {row}" if row is not None else f"run {run_id} of {params}"
+    raise ValueError(f"No {selection} in {filename}")
+
+
+def replay_run(row, engine=None, max_steps=None, recorder=None, profiler=None):
+    """
+    Re-execute the run of a raw data row
+
+    The replay writes no event log, so the log of the original run (with
+    EVENT_LOG_KEYFRAMES set) is kept; a DiscardedEventLog takes its place,
+    so the replay runs the same loop as the logged sweep.
+
+    Args:
+        row: Dictionary from find_run() or a result dictionary
+        engine: Run engine (default: config.ENGINE)
+        max_steps: Maximum simulation steps (default: config.MAX_STEPS)
+        recorder: Optional TimeSeriesRecorder
+        profiler: Optional cProfile.Profile that runs model.run()
+
+    Returns:
+        Result dictionary as from run_single_simulation()
+    """
+    if row.get('seed') in (None, ''):
+        raise ValueError("Row has no seed (raw data written before seeds were stored)")
+
+    engine = config.ENGINE if engine is None else engine
+    max_steps = config.MAX_STEPS if max_steps is None else max_steps
+    correlation = float(row['correlation'])
+    grid_size, run_id, seed = int(row['grid_size']), int(row['run_id']), int(row['seed'])
+
+    event_log = DiscardedEventLog() if config.EVENT_LOG_KEYFRAMES else None
+    return run_single_simulation((correlation, grid_size, config.INTERPRETABLE_FEATURES, max_steps, engine,
+                                  config.CORRELATION_MODEL, run_id, seed),
+                                 recorder=recorder, event_log=event_log, profiler=profiler)
+
+
+def main():
+    """Main execution function"""
+    parser = argparse.ArgumentParser(description="Replay one run of the raw data")
+    parser.add_argument("--row", type=int, help="Index of the data row (0 = first run in the file)")
+    parser.add_argument("--correlation", type=float, help="Correlation value of the run")
+    parser.add_argument("--run-id", type=int, help="Run index within its correlation value")
+    parser.add_argument(
+        "--raw-data",
+        default=config.RAW_DATA_FILE,
+        help=f"Raw data file (default: {config.RAW_DATA_FILE})"
+    )
+    parser.add_argument("--engine", help=f"Run engine (default: {config.ENGINE})")
+    parser.add_argument("--max-steps", type=int, help=f"Maximum steps (default: {config.MAX_STEPS})")
+    parser.add_argument(
+        "--time-series",
+        type=int,
+        default=0,
+        metavar="SAMPLES",
+        help="Record the observables at this many steps and save them to --output"
+    )
+    parser.add_argument("--spacing", choices=SPACINGS, default=config.TIME_SERIES_SPACING,
+                        help="Spacing of the time-series samples")
+    parser.add_argument("--output", help="Time-series CSV (default: replay_<run>_time_series.csv in the results)")
+    parser.add_argument("--profile", action="store_true", help="Profile the run and print the top functions")
+    parser.add_argument("--profile-file", help="Also save the profile statistics to this file (pstats format)")
+
+    args = parser.parse_args()
+    if args.row is None and None in (args.correlation, args.run_id):
+        parser.error("Specify --row or both --correlation and --run-id")
+
+    row = find_run(args.run_id, row=args.row, filename=args.raw_data, correlation=args.correlation)
+    name = f"correlation{float(row['correlation']):+.2f}_run{row['run_id']}"
+    if row.get('seed') in (None, ''):
+        parser.error(f"{name} has no seed in {args.raw_data} (raw data written before seeds were stored)")
+    print(f"Replaying {name} (seed {row['seed']})")
+
+    max_steps = config.MAX_STEPS if args.max_steps is None else args.max_steps
+    recorder = None
+    if args.time_series:
+        recorder = TimeSeriesRecorder(sample_steps(max_steps, args.time_series, args.spacing))
+    profiler = cProfile.Profile() if args.profile or args.profile_file else None
+
+    result = replay_run(row, engine=args.engine, max_steps=max_steps, recorder=recorder, profiler=profiler)
+
+    # A different step count means the config no longer matches the sweep
+    stored_steps = int(float(row['steps_to_convergence']))
+    print(f"Steps to convergence: {result['steps_to_convergence']} (stored: {stored_steps})")
+    if result['steps_to_convergence'] != stored_steps:
+        print("Warning: replay differs from the raw data; check ENGINE, MAX_STEPS and EVENT_LOG_KEYFRAMES "
+              "in config.py")
+        if (args.engine or config.ENGINE) == 'jit' and not NUMBA_AVAILABLE:
+            print("Numba is not installed, so 'jit' ran the Python loop, whose random stream differs")
+
+    if recorder is not None:
+        output = args.output or os.path.join(config.RESULTS_DIR, f"replay_{name}_time_series.csv")
+        save_raw_data(result.pop('time_series'), output)
+
+    if profiler is not None:
+        if args.profile_file:
+            profiler.dump_stats(args.profile_file)
+            print(f"Saved profile to {args.profile_file}")
+        if args.profile:
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
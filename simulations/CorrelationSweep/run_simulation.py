@@ -13,7 +13,9 @@ import sys
 import time
 import os
 
-# Add current directory to path
+# Add current directory and its parent, which holds the shared axelrod_core
+# package, to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
@@ -53,6 +55,7 @@ def main():
     print(f"  Total simulations: {len(config.CORRELATION_VALUES) * config.RUNS_PER_CORRELATION}")
     print(f"  Random seed: {config.RANDOM_SEED}")
     print(f"  Max steps per simulation: {config.MAX_STEPS}")
+    print(f"  Engine: {config.ENGINE}")
     print()
 
     # Step 1: Data Collection
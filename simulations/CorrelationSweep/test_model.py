@@ -3,11 +3,14 @@ Quick test script to verify the interpretable model works correctly
 """
 import sys
 import os
+# Add current directory and its parent, which holds the shared axelrod_core
+# package, to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import config
+from axelrod_core.metrics import calculate_all_metrics
 from axelrod_interpretable_model import AxelrodInterpretableModel
-from metrics import calculate_all_metrics
 
 
 def test_model():
@@ -45,7 +48,7 @@ def test_model():
 
         # Check if model is functioning
         print(f"Model step count: {model.step_count}")
-        print(f"Current failed interactions: {model.failed_interactions}")
+        print(f"Current active edges: {model.active_edges}")
 
         # Calculate metrics on current state
         current_grid = model.get_grid()
@@ -17,19 +17,82 @@ RUNS_PER_COMBINATION = 100
 # Maximum simulation steps (safety limit to prevent infinite loops)
 MAX_STEPS = 1000000
 
+# Simulation engine
+# 'reference': one random (agent, neighbor) draw per step
+# 'rejection_free': n-fold way, samples only active pairs and adds the skipped
+#   failed steps as a geometric draw (same steps_to_convergence distribution;
+#   up to 4x faster than 'reference' where most draws fail, e.g. F=3 q=20,
+#   but about 1.3x slower where most succeed, e.g. F=5 q=10 and F=10 q=20)
+# 'batched': BatchedAxelrodModel, advances BATCH_SIZE replicas together with
+#   vectorized NumPy steps; only pays off for long runs: with 100 replicas on
+#   a 10x10 grid about 1.5x faster than 'reference' at F=5 q=10 and F=10 q=20
+#   (tens of thousands of steps per run), 1.5-2x slower for short runs
+# 'jit': the reference loop compiled with Numba (pip install numba); same
+#   steps_to_convergence distribution, falls back to 'reference' without Numba
+ENGINE = 'reference'
+
+# Replicas per task with ENGINE = 'batched'. Batches are fixed blocks of run
+# ids, so the results do not depend on the number of workers. One batch per
+# parameter combination: smaller batches spread the NumPy overhead of a step
+# over fewer replicas and lose to 'reference' (16 replicas: up to 1.7x slower).
+BATCH_SIZE = RUNS_PER_COMBINATION
+
+# Metrics computed for every run (see metrics.available_metrics());
+# steps_to_convergence is always recorded. Shared intermediates such as
+# culture codes are computed once per run and only when a selected metric
+# needs them. The standard plots use unique cultures, largest domain and
+# average distance; a sweep that only needs convergence time and consensus
+# probability can use ['global_consensus'].
+METRICS = ['unique_cultures', 'num_domains', 'largest_domain_size',
+           'largest_domain_percentage', 'avg_cultural_distance']
+
+# In-run time series (see recorder.py): unique cultures, largest culture share
+# and active-bond fraction sampled at TIME_SERIES_SAMPLES steps of every run
+# and saved to TIME_SERIES_FILE next to the raw data. 0 disables recording.
+# 'log' spacing resolves the fast early coarsening, 'linear' the late decay.
+# With SNAPSHOT_EVERY > 0, every SNAPSHOT_EVERY-th sample also stores the full
+# grid in a memory-mapped .npy file per run under SNAPSHOT_DIR.
+# Not recorded with ENGINE = 'batched'.
+TIME_SERIES_SAMPLES = 0
+TIME_SERIES_SPACING = 'log'
+SNAPSHOT_EVERY = 0
+
+# Optional change-event log of every run (see event_log.py): one 16-byte record
+# per adoption plus a full-grid keyframe every EVENT_LOG_KEYFRAMES events,
+# written to EVENT_LOG_DIR. Much smaller than snapshots of every state; any
+# step can be replayed with event_log.EventLogReader. 0 disables the log.
+# With ENGINE = 'jit' a logged run takes the Python loop instead of the
+# compiled one: same distributions, but a seed gives a different run than
+# without the log (time series do not change runs).
+EVENT_LOG_KEYFRAMES = 0
+
 # Output paths
 RESULTS_DIR = "results"
 RAW_DATA_FILE = "results/raw_data.csv"
 AGGREGATED_DATA_FILE = "results/aggregated_data.csv"
 PLOTS_DIR = "results/plots"
+TIME_SERIES_FILE = "results/time_series.csv"
+SNAPSHOT_DIR = "results/snapshots"
+EVENT_LOG_DIR = "results/event_logs"
 
-# Random seed for reproducibility (None = random)
+# Random seed for reproducibility (None = random). Every run gets its own seed
+# spawned from it (stored in the raw data), so results are the same for any
+# number of workers
 RANDOM_SEED = 42
 
 # Progress tracking
 SHOW_PROGRESS_BAR = True
-SAVE_INTERVAL = 10  # Save results every N combinations
+
+# Results are appended to the raw data file as runs finish; written rows are
+# forced to disk after at most SYNC_SECONDS or SYNC_BYTES of output
+SYNC_SECONDS = 10
+SYNC_BYTES = 1048576
 
 # Parallelization
 USE_PARALLEL = True  # Enable parallel processing for faster execution
-# NUM_WORKERS will be automatically set to min(cpu_count(), RUNS_PER_COMBINATION)
+# NUM_WORKERS will be automatically set to min(cpu_count(), total number of runs)
+
+# Dispatch the runs with the longest predicted run time first (from the
+# steps_to_convergence of an earlier raw data file, else a parameter-based
+# guess), so the sweep does not end with a long single-core tail
+LONGEST_FIRST = True
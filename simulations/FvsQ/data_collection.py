@@ -8,8 +8,19 @@ import numpy as np
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
 import config
-from axelrod_model import AxelrodModel
-from metrics import calculate_all_metrics
+from axelrod_core.axelrod_model import AxelrodModel
+from axelrod_core.batched_model import BatchedAxelrodModel
+from axelrod_core.engine import ENGINES
+from axelrod_core.event_log import EventLog
+from axelrod_core.metrics import calculate_all_metrics, calculate_batch_metrics, split_batch_metrics
+from axelrod_core.recorder import TimeSeriesRecorder, sample_steps
+from axelrod_core.result_writer import ResultWriter
+from axelrod_core.rng import spawn_seeds
+from axelrod_core.scheduling import historical_costs, longest_first, predict_costs
+
+
+# Values of config.ENGINE this study can run
+SWEEP_ENGINES = ENGINES + ('batched',)
 
 
 def set_random_seed(seed):
@@ -19,27 +30,79 @@ def set_random_seed(seed):
         np.random.seed(seed)
 
 
-def run_single_simulation(args):
+def make_recorder(max_steps, name):
+    """
+    Time-series recorder for one run as set up in config.py
+
+    Args:
+        max_steps: Maximum simulation steps of the run
+        name: File name (without extension) of the run's grid snapshots
+
+    Returns:
+        TimeSeriesRecorder, or None if config.TIME_SERIES_SAMPLES is 0
+    """
+    if not config.TIME_SERIES_SAMPLES:
+        return None
+
+    snapshot_path = None
+    if config.SNAPSHOT_EVERY:
+        os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+        snapshot_path = os.path.join(config.SNAPSHOT_DIR, f"{name}.npy")
+
+    schedule = sample_steps(max_steps, config.TIME_SERIES_SAMPLES, config.TIME_SERIES_SPACING)
+    return TimeSeriesRecorder(schedule, snapshot_path=snapshot_path,
+                              snapshot_every=config.SNAPSHOT_EVERY or 1)
+
+
+def make_event_log(name):
+    """
+    Change-event log for one run as set up in config.py
+
+    Args:
+        name: Base file name of the run's log files
+
+    Returns:
+        EventLog, or None if config.EVENT_LOG_KEYFRAMES is 0
+    """
+    if not config.EVENT_LOG_KEYFRAMES:
+        return None
+
+    os.makedirs(config.EVENT_LOG_DIR, exist_ok=True)
+    return EventLog(os.path.join(config.EVENT_LOG_DIR, name), keyframe_interval=config.EVENT_LOG_KEYFRAMES)
+
+
+def run_single_simulation(args, recorder=None, event_log='config', profiler=None):
     """
     Run a single simulation with given parameters
 
     This function signature is designed for multiprocessing.Pool.map()
 
     Args:
-        args: Tuple of (F, q, grid_size, max_steps, run_id)
+        args: Tuple of (F, q, grid_size, max_steps, engine, run_id, seed)
+        recorder: TimeSeriesRecorder to attach instead of the one set up in
+            config.py (see replay.py)
+        event_log: EventLog to attach, None for no log, or 'config' for the
+            one set up in config.py
+        profiler: Optional cProfile.Profile that runs model.run()
 
     Returns:
         Dictionary with parameters and metrics
     """
-    F, q, grid_size, max_steps, run_id = args
+    F, q, grid_size, max_steps, engine, run_id, seed = args
 
     # Create and run model
-    model = AxelrodModel(grid_size, F, q, max_steps)
-    steps = model.run()
+    name = f"F{F}_q{q}_run{run_id}"
+    if recorder is None:
+        recorder = make_recorder(max_steps, name)
+    if event_log == 'config':
+        event_log = make_event_log(name)
+    model = AxelrodModel(grid_size, F, q, max_steps, engine=engine, seed=seed, recorder=recorder,
+                         event_log=event_log)
+    steps = model.run() if profiler is None else profiler.runcall(model.run)
     final_grid = model.get_grid()
 
     # Calculate metrics
-    metrics = calculate_all_metrics(final_grid, steps)
+    metrics = calculate_all_metrics(final_grid, steps, metrics=config.METRICS)
 
     # Combine parameters and metrics
     result = {
@@ -47,15 +110,61 @@ def run_single_simulation(args):
         'q': q,
         'grid_size': grid_size,
         'run_id': run_id,
+        'seed': seed,
         **metrics
     }
 
+    if recorder is not None:
+        result['time_series'] = recorder.rows(F=F, q=q, grid_size=grid_size, run_id=run_id)
+
     return result
 
 
-def run_parameter_combination(F, q, num_runs, grid_size, max_steps, use_parallel=True):
+def run_batched_simulations(args, profiler=None):
+    """
+    Run several simulations together with the vectorized BatchedAxelrodModel
+
+    This function signature is designed for multiprocessing.Pool.map()
+
+    Args:
+        args: Tuple of (F, q, grid_size, max_steps, seed, run_ids); seed
+            drives the whole batch and is stored with each of its runs
+        profiler: Optional cProfile.Profile that runs model.run()
+
+    Returns:
+        List of dictionaries with parameters and metrics, one per run_id
     """
-    Run multiple simulations for a single (F, q) combination using parallelization
+    F, q, grid_size, max_steps, seed, run_ids = args
+
+    # Create and run all replicas at once
+    model = BatchedAxelrodModel(len(run_ids), grid_size, F, q, max_steps, seed=seed)
+    steps = model.run() if profiler is None else profiler.runcall(model.run)
+
+    # Calculate metrics of all replicas in one vectorized pass
+    replica_metrics = split_batch_metrics(calculate_batch_metrics(model.grids, steps, metrics=config.METRICS))
+
+    results = []
+    for run_id, metrics in zip(run_ids, replica_metrics):
+        # Combine parameters and metrics
+        results.append({
+            'F': F,
+            'q': q,
+            'grid_size': grid_size,
+            'run_id': run_id,
+            'seed': seed,
+            **metrics
+        })
+
+    return results
+
+
+def parameter_combination_tasks(F, q, num_runs, grid_size, max_steps, engine='reference', batch_size=100,
+                                seed_sequence=None):
+    """
+    Tasks of all simulations of a single (F, q) combination
+
+    Every run gets its own seed spawned from seed_sequence, so its result
+    does not depend on which worker runs it or on how many there are.
 
     Args:
         F: Number of features
@@ -63,78 +172,170 @@ def run_parameter_combination(F, q, num_runs, grid_size, max_steps, use_parallel
         num_runs: Number of simulation runs
         grid_size: Size of square grid
         max_steps: Maximum simulation steps
-        use_parallel: Whether to use parallel processing (default: True)
+        engine: Model run engine ('reference', 'rejection_free', 'jit' or 'batched')
+        batch_size: Replicas per task with the 'batched' engine; batches are
+            consecutive run ids seeded with the seed of their first run
+        seed_sequence: numpy SeedSequence of this combination (default:
+            fresh entropy)
+
+    Returns:
+        List of tasks for run_task()
+    """
+    if seed_sequence is None:
+        seed_sequence = np.random.SeedSequence()
+    seeds = spawn_seeds(seed_sequence, num_runs)
+
+    if engine == 'batched':
+        return [(run_batched_simulations, (F, q, grid_size, max_steps, seeds[start],
+                                           list(range(start, min(start + batch_size, num_runs)))))
+                for start in range(0, num_runs, batch_size)]
+
+    return [(run_single_simulation, (F, q, grid_size, max_steps, engine, run_idx, seeds[run_idx]))
+            for run_idx in range(num_runs)]
+
+
+def run_task(task):
+    """
+    Run one task of the flattened sweep
+
+    This function signature is designed for multiprocessing.Pool.imap_unordered()
+
+    Args:
+        task: Tuple of (function, args), function is run_single_simulation
+            or run_batched_simulations
 
     Returns:
         List of result dictionaries
     """
-    # Prepare arguments for all runs
-    args_list = [(F, q, grid_size, max_steps, run_idx) for run_idx in range(num_runs)]
+    function, args = task
+    results = function(args)
+    return results if isinstance(results, list) else [results]
+
+
+def run_tasks(tasks, num_workers):
+    """
+    Run all tasks of a sweep in one long-lived worker pool
+
+    Results stream back as tasks finish, so a slow run never holds up the
+    runs of other parameter values.
 
-    if use_parallel and num_runs > 1:
-        # Use parallel processing
-        num_workers = min(cpu_count(), num_runs)
+    Args:
+        tasks: List of tasks for run_task()
+        num_workers: Number of worker processes (1 = run in this process)
+
+    Yields:
+        List of result dictionaries of each finished task, in completion order
+    """
+    if num_workers > 1:
         with Pool(processes=num_workers) as pool:
-            results = pool.map(run_single_simulation, args_list)
+            yield from pool.imap_unordered(run_task, tasks)
     else:
-        # Sequential processing (fallback)
-        results = [run_single_simulation(args) for args in args_list]
+        for task in tasks:
+            yield run_task(task)
 
-    return results
+
+def schedule_longest_first(tasks):
+    """
+    Order tasks by decreasing predicted run time (see scheduling.py)
+
+    Predictions use the mean steps_to_convergence per (F, q) in an earlier
+    config.RAW_DATA_FILE. Unseen combinations fall back to F * q (more
+    states mean more failed interactions, more features more work per step).
+
+    Args:
+        tasks: List of tasks for run_task()
+
+    Returns:
+        The same tasks, most expensive first
+    """
+    history = historical_costs(config.RAW_DATA_FILE, ('F', 'q'))
+    keys = [(float(args[0]), float(args[1])) for _, args in tasks]
+
+    # A batched task runs several replicas
+    runs = [len(args[-1]) if function is run_batched_simulations else 1 for function, args in tasks]
+    costs = predict_costs(keys, history, lambda key: key[0] * key[1]) * np.array(runs)
+    return longest_first(tasks, costs)
 
 
 def collect_all_data():
     """
     Run all simulations for all (F, q) combinations
 
+    All runs of the sweep go to one worker pool as a flat task list.
+
     Returns:
         List of all simulation results
     """
-    # Set random seed
+    # Fail before any worker starts on a mistyped engine
+    if config.ENGINE not in SWEEP_ENGINES:
+        raise ValueError(f"Unknown ENGINE '{config.ENGINE}' in config.py, expected one of {SWEEP_ENGINES}")
+
+    # Set random seed; every run draws from its own stream spawned from it
     set_random_seed(config.RANDOM_SEED)
+    root_seed = np.random.SeedSequence(config.RANDOM_SEED)
 
     all_results = []
     total_combinations = len(config.F_VALUES) * len(config.Q_VALUES)
+    total_runs = total_combinations * config.RUNS_PER_COMBINATION
 
     print(f"Starting data collection...")
     print(f"Total combinations: {total_combinations}")
     print(f"Runs per combination: {config.RUNS_PER_COMBINATION}")
-    print(f"Total simulations: {total_combinations * config.RUNS_PER_COMBINATION}")
+    print(f"Total simulations: {total_runs}")
     print(f"Grid size: {config.GRID_SIZE}x{config.GRID_SIZE}")
+    print(f"Engine: {config.ENGINE}")
+    print(f"Root seed entropy: {root_seed.entropy}")
+    print(f"Scheduling: {'longest first' if config.LONGEST_FIRST else 'sweep order'}")
     print(f"Parallel processing: {'Enabled' if config.USE_PARALLEL else 'Disabled'}")
     if config.USE_PARALLEL:
         print(f"CPU cores available: {cpu_count()}")
     print()
 
-    # Create progress bar for combinations
+    # Flatten the sweep: one task per run (per batch of replicas for 'batched')
     combinations = [(F, q) for F in config.F_VALUES for q in config.Q_VALUES]
-
-    if config.SHOW_PROGRESS_BAR:
-        pbar = tqdm(combinations, desc="Processing combinations", unit="combo")
-    else:
-        pbar = combinations
-
-    for combo_idx, (F, q) in enumerate(pbar):
-        # Update progress bar description
-        if config.SHOW_PROGRESS_BAR:
-            pbar.set_description(f"F={F}, q={q}")
-
-        # Run simulations for this combination
-        results = run_parameter_combination(
+    tasks = []
+    for (F, q), seed_sequence in zip(combinations, root_seed.spawn(len(combinations))):
+        tasks.extend(parameter_combination_tasks(
             F, q,
             config.RUNS_PER_COMBINATION,
             config.GRID_SIZE,
             config.MAX_STEPS,
-            use_parallel=config.USE_PARALLEL
-        )
-
-        all_results.extend(results)
-
-        # Periodic save
-        if (combo_idx + 1) % config.SAVE_INTERVAL == 0:
-            save_raw_data(all_results)
-            if not config.SHOW_PROGRESS_BAR:
-                print(f"Saved progress: {combo_idx + 1}/{total_combinations} combinations")
+            engine=config.ENGINE,
+            batch_size=config.BATCH_SIZE,
+            seed_sequence=seed_sequence
+        ))
+    num_workers = min(cpu_count(), len(tasks)) if config.USE_PARALLEL else 1
+
+    # Dispatch the most expensive runs first so no long run is left for the end
+    if config.LONGEST_FIRST:
+        tasks = schedule_longest_first(tasks)
+
+    # Progress per finished run
+    pbar = tqdm(total=total_runs, desc="Running simulations", unit="run") if config.SHOW_PROGRESS_BAR else None
+
+    # Results are appended to the files as they arrive (see result_writer.py)
+    raw_writer = ResultWriter(config.RAW_DATA_FILE, config.SYNC_SECONDS, config.SYNC_BYTES)
+    series_writer = ResultWriter(config.TIME_SERIES_FILE, config.SYNC_SECONDS, config.SYNC_BYTES)
+
+    with raw_writer, series_writer:
+        for results in run_tasks(tasks, num_workers):
+            # Time-series rows travel with the results, keep them out of raw_data.csv
+            series_writer.write([row for result in results for row in result.pop('time_series', ())])
+            synced = raw_writer.write(results)
+            all_results.extend(results)
+
+            if pbar is not None:
+                pbar.update(len(results))
+                pbar.set_postfix_str(f"F={results[-1]['F']}, q={results[-1]['q']}")
+            elif synced:
+                print(f"Saved progress: {len(all_results)}/{total_runs} runs")
+
+    if pbar is not None:
+        pbar.close()
+
+    # Completion order depends on the workers, store runs in sweep order
+    order = {combination: idx for idx, combination in enumerate(combinations)}
+    all_results.sort(key=lambda r: (order[(r['F'], r['q'])], r['run_id']))
 
     print("\nData collection complete!")
     return all_results
@@ -144,6 +345,9 @@ def save_raw_data(results, filename=None):
     """
     Save raw simulation results to CSV
 
+    The file is replaced in one step, so readers see either the old or the
+    new contents (collect_all_data appends to the same file while running).
+
     Args:
         results: List of result dictionaries
         filename: Output filename (default: config.RAW_DATA_FILE)
@@ -161,14 +365,33 @@ def save_raw_data(results, filename=None):
     # Write to CSV
     fieldnames = results[0].keys()
 
-    with open(filename, 'w', newline='') as csvfile:
+    temporary = f"{filename}.tmp"
+    with open(temporary, 'w', newline='') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(results)
+    os.replace(temporary, filename)
 
     print(f"Saved {len(results)} results to {filename}")
 
 
+def metric_values(results, metric):
+    """
+    Values of one metric over a group of results
+
+    Args:
+        results: List of result dictionaries
+        metric: Metric name
+
+    Returns:
+        List of values, or None if some result lacks the metric (not
+        selected in config.METRICS, or raw data from an older run)
+    """
+    if all(metric in r for r in results):
+        return [r[metric] for r in results]
+    return None
+
+
 def aggregate_data(results):
     """
     Aggregate results by (F, q) combination
@@ -194,9 +417,6 @@ def aggregate_data(results):
     for (F, q), group_results in groups.items():
         # Extract metric values
         steps = [r['steps_to_convergence'] for r in group_results]
-        unique_cultures = [r['unique_cultures'] for r in group_results]
-        largest_domain = [r['largest_domain_percentage'] for r in group_results]
-        avg_distance = [r['avg_cultural_distance'] for r in group_results]
 
         # Calculate statistics
         agg_result = {
@@ -209,25 +429,38 @@ def aggregate_data(results):
             'steps_std': np.std(steps),
             'steps_min': np.min(steps),
             'steps_max': np.max(steps),
-
-            # Unique cultures
-            'unique_cultures_mean': np.mean(unique_cultures),
-            'unique_cultures_std': np.std(unique_cultures),
-            'unique_cultures_min': np.min(unique_cultures),
-            'unique_cultures_max': np.max(unique_cultures),
-
-            # Largest domain percentage
-            'largest_domain_mean': np.mean(largest_domain),
-            'largest_domain_std': np.std(largest_domain),
-
-            # Average cultural distance
-            'avg_distance_mean': np.mean(avg_distance),
-            'avg_distance_std': np.std(avg_distance),
-
-            # Probability of global consensus
-            'prob_global_consensus': sum(1 for uc in unique_cultures if uc == 1) / len(unique_cultures)
         }
 
+        # Statistics of the metrics this sweep selected (config.METRICS)
+        unique_cultures = metric_values(group_results, 'unique_cultures')
+        if unique_cultures is not None:
+            agg_result['unique_cultures_mean'] = np.mean(unique_cultures)
+            agg_result['unique_cultures_std'] = np.std(unique_cultures)
+            agg_result['unique_cultures_min'] = np.min(unique_cultures)
+            agg_result['unique_cultures_max'] = np.max(unique_cultures)
+
+        largest_domain = metric_values(group_results, 'largest_domain_percentage')
+        if largest_domain is not None:
+            agg_result['largest_domain_mean'] = np.mean(largest_domain)
+            agg_result['largest_domain_std'] = np.std(largest_domain)
+
+        avg_distance = metric_values(group_results, 'avg_cultural_distance')
+        if avg_distance is not None:
+            agg_result['avg_distance_mean'] = np.mean(avg_distance)
+            agg_result['avg_distance_std'] = np.std(avg_distance)
+
+        # Probability of global consensus
+        global_consensus = metric_values(group_results, 'global_consensus')
+        if unique_cultures is not None:
+            agg_result['prob_global_consensus'] = sum(1 for uc in unique_cultures if uc == 1) / len(unique_cultures)
+        elif global_consensus is not None:
+            agg_result['prob_global_consensus'] = np.mean(global_consensus)
+
+        num_domains = metric_values(group_results, 'num_domains')
+        if num_domains is not None:
+            agg_result['num_domains_mean'] = np.mean(num_domains)
+            agg_result['num_domains_std'] = np.std(num_domains)
+
         aggregated.append(agg_result)
 
     return aggregated
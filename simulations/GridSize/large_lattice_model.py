@@ -0,0 +1,156 @@
+"""
+Axelrod model for large lattices (1000x1000 and beyond)
+
+Runs the rejection-free engine of AxelrodEngine, which tracks the active edges
+(0 < overlap < F) as a frontier and only ever samples interactions from it;
+without an event log its event loop is the Numba-compiled one of jit_kernel.
+Traits, overlaps and neighbor tables stay in compact NumPy arrays, so there
+are no per-agent Python objects and no full-grid scans after initialization.
+
+Run times on one core with F=5, q=8 (compiled loop): a run to absorption
+takes about 100 s on 100x100 and 11 minutes on 141x141; the steps grow like
+grid_size^3.7, and an event costs about 3x more once the tables no longer
+fit the CPU cache. On 1000x1000 the loop advances about 1e9 steps in 20
+minutes with three quarters of the edges still active; absorption would
+take weeks (about 4e12 steps extrapolated). Large lattices are meant for the
+early coarsening: cap max_steps and sample it with a recorder.
+"""
+import time
+
+import numpy as np
+from axelrod_core.axelrod_model import AxelrodModel
+from axelrod_core.jit_kernel import NUMBA_AVAILABLE, seed_kernel
+
+# Events per call of the event loop; progress is reported between calls
+CHUNK_EVENTS = 1 << 16
+
+
+class LargeLatticeModel(AxelrodModel):
+    """
+    Rejection-free Axelrod model with compact storage and progress reports
+
+    Active edges are kept in one swap-remove segment per geometry class (pair
+    of endpoint degrees, which fixes the event rate), so selecting the next
+    interaction and updating the frontier after it are O(1)
+    (see AxelrodEngine._build_frontier).
+    """
+
+    def __init__(self, grid_size, F, q, max_steps=10**12, initial_grid=None, topology=None,
+                 seed=None, progress_interval=None, track_cultures=False,
+                 recorder=None, event_log=None):
+        """
+        Initialize the large-lattice model
+
+        Args:
+            grid_size: Size of the square grid (grid_size x grid_size)
+            F: Number of cultural features per agent (at most 255)
+            q: Number of possible states per feature
+            max_steps: Maximum number of simulation steps
+            initial_grid: Optional (grid_size, grid_size, F) array to start
+                from instead of a random grid
+            topology: Optional Topology with grid_size^2 agents
+                (default: open von Neumann lattice)
+            seed: Seed or numpy Generator for all random draws of this model
+                (default: derived from the global np.random state)
+            progress_interval: Print a progress line every this many seconds
+                during run() (None = silent)
+            track_cultures: Keep live culture counts for get_observables()
+            recorder: Optional TimeSeriesRecorder sampling the observables
+                during run() (see recorder.py); the compiled loop stops at
+                every sample, so a seed gives the same run either way
+            event_log: Optional EventLog receiving every adoption during
+                run() (see event_log.py); the run then uses the Python event
+                loop, same dynamics but a different random stream
+        """
+        if F > 255:
+            raise ValueError(f"F={F} is too large, edge overlaps are stored in one byte")
+
+        self.progress_interval = progress_interval
+
+        # Step accounting is the rejection-free one: only successful
+        # interactions are simulated, failed steps are added as geometric draws
+        super().__init__(grid_size, F, q, max_steps, engine='rejection_free',
+                         initial_grid=initial_grid, topology=topology, seed=seed,
+                         track_cultures=track_cultures, recorder=recorder, event_log=event_log)
+
+    def _build_neighbor_tables(self):
+        """
+        Zero-copy views of the topology CSR tables for scalar access
+
+        Sets:
+            _offsets, _degree, _neighbor_ids, _neighbor_edges
+        """
+        self._offsets = memoryview(self.topology.offsets)
+        self._degree = memoryview(self.topology.degree)
+        self._neighbor_ids = memoryview(self.topology.neighbor_ids)
+        self._neighbor_edges = memoryview(self.topology.neighbor_edges)
+
+    def _build_edge_cache(self):
+        """
+        Compute the initial shared-feature count of every topology edge
+
+        Sets:
+            edges: int array of shape (num_edges, 2) with flat agent indices
+            edge_overlap: uint8 array of shared feature counts per edge
+            active_edges: number of edges with 0 < overlap < F
+        """
+        self.edges = self.topology.edges
+        self.edge_overlap = np.sum(
+            self.agents[self.edges[:, 0]] == self.agents[self.edges[:, 1]], axis=1, dtype=np.uint8
+        )
+        self.active_edges = int(np.count_nonzero(
+            (self.edge_overlap > 0) & (self.edge_overlap < self.F)
+        ))
+        self._overlap = memoryview(self.edge_overlap)
+
+    def _report_progress(self, elapsed):
+        """Print one progress line"""
+        self._sync_cultures()
+        print(f"  {self.grid_size}x{self.grid_size}: step {self.step_count:,}, "
+              f"active edges {self.active_edges:,} "
+              f"({100 * self.active_edges / max(len(self.edges), 1):.2f}%), "
+              + (f"cultures {self.cultures.num_cultures:,}, " if self.cultures is not None else "")
+              + f"{elapsed:.0f}s elapsed", flush=True)
+
+    def run(self):
+        """
+        Run the simulation until absorbing state or max steps reached
+
+        Without an event log the events run in the Numba-compiled loop of
+        jit_kernel when Numba is installed, otherwise in the engine's Python
+        loop, which reports every adoption.
+
+        Returns:
+            Number of steps taken to reach absorbing state (same distribution
+            as AxelrodModel with the reference engine)
+        """
+        hooks = [hook for hook in (self.recorder, self.event_log) if hook is not None]
+        for hook in hooks:
+            hook.start(self)
+
+        if NUMBA_AVAILABLE and self.event_log is None:
+            # One compiled stream per run, continued across chunks and samples
+            seed_kernel(int(self.rng.generator.integers(2**32)))
+            advance = self._advance_frontier_jit
+        else:
+            advance = self._advance_frontier
+
+        start = time.monotonic()
+        next_report = start + self.progress_interval if self.progress_interval else None
+
+        # Fixed-size chunks, so a seed gives the same run with or without progress lines
+        self._start_frontier()
+        while not advance(CHUNK_EVENTS):
+            now = time.monotonic()
+            if next_report is not None and now >= next_report:
+                self._report_progress(now - start)
+                next_report = now + self.progress_interval
+        self._finish_frontier()
+        self._sync_cultures()
+
+        if next_report is not None:
+            self._report_progress(time.monotonic() - start)
+
+        for hook in hooks:
+            hook.finish(self)
+        return self.step_count
@@ -8,8 +8,18 @@ import numpy as np
 from tqdm import tqdm
 from multiprocessing import Pool, cpu_count
 import config
+from axelrod_core.engine import ENGINES
+from axelrod_core.event_log import EventLog
+from axelrod_core.metrics import calculate_all_metrics
+from axelrod_core.recorder import TimeSeriesRecorder, sample_steps
+from axelrod_core.result_writer import ResultWriter
+from axelrod_core.rng import spawn_seeds
+from axelrod_core.scheduling import historical_costs, longest_first, predict_costs
 from axelrod_interpretable_model import InterpretableAxelrodModel
-from metrics import calculate_all_metrics
+
+
+# Values of config.ENGINE this study can run
+SWEEP_ENGINES = ENGINES
 
 
 def set_random_seed(seed):
@@ -19,30 +29,83 @@ def set_random_seed(seed):
         np.random.seed(seed)
 
 
-def run_single_simulation(args):
+def make_recorder(max_steps, name):
+    """
+    Time-series recorder for one run as set up in config.py
+
+    Args:
+        max_steps: Maximum simulation steps of the run
+        name: File name (without extension) of the run's grid snapshots
+
+    Returns:
+        TimeSeriesRecorder, or None if config.TIME_SERIES_SAMPLES is 0
+    """
+    if not config.TIME_SERIES_SAMPLES:
+        return None
+
+    snapshot_path = None
+    if config.SNAPSHOT_EVERY:
+        os.makedirs(config.SNAPSHOT_DIR, exist_ok=True)
+        snapshot_path = os.path.join(config.SNAPSHOT_DIR, f"{name}.npy")
+
+    schedule = sample_steps(max_steps, config.TIME_SERIES_SAMPLES, config.TIME_SERIES_SPACING)
+    return TimeSeriesRecorder(schedule, snapshot_path=snapshot_path,
+                              snapshot_every=config.SNAPSHOT_EVERY or 1)
+
+
+def make_event_log(name):
+    """
+    Change-event log for one run as set up in config.py
+
+    Args:
+        name: Base file name of the run's log files
+
+    Returns:
+        EventLog, or None if config.EVENT_LOG_KEYFRAMES is 0
+    """
+    if not config.EVENT_LOG_KEYFRAMES:
+        return None
+
+    os.makedirs(config.EVENT_LOG_DIR, exist_ok=True)
+    return EventLog(os.path.join(config.EVENT_LOG_DIR, name), keyframe_interval=config.EVENT_LOG_KEYFRAMES)
+
+
+def run_single_simulation(args, recorder=None, event_log='config', profiler=None):
     """
     Run a single simulation with given parameters
 
     This function signature is designed for multiprocessing.Pool.map()
 
     Args:
-        args: Tuple of (ordered_count, unordered_count, grid_size, max_steps, run_id)
+        args: Tuple of (ordered_count, unordered_count, grid_size, max_steps, engine, run_id, seed)
+        recorder: TimeSeriesRecorder to attach instead of the one set up in
+            config.py (see replay.py)
+        event_log: EventLog to attach, None for no log, or 'config' for the
+            one set up in config.py
+        profiler: Optional cProfile.Profile that runs model.run()
 
     Returns:
         Dictionary with parameters and metrics
     """
-    ordered_count, unordered_count, grid_size, max_steps, run_id = args
+    ordered_count, unordered_count, grid_size, max_steps, engine, run_id, seed = args
 
     # Get feature configurations
     feature_configs = config.get_feature_configs(ordered_count, unordered_count)
 
     # Create and run model
-    model = InterpretableAxelrodModel(grid_size, feature_configs, max_steps)
-    steps = model.run()
+    name = f"ordered{ordered_count}_unordered{unordered_count}_run{run_id}"
+    if recorder is None:
+        recorder = make_recorder(max_steps, name)
+    if event_log == 'config':
+        event_log = make_event_log(name)
+    model = InterpretableAxelrodModel(grid_size, feature_configs, max_steps, engine=engine, seed=seed,
+                                      correlations=config.CORRELATIONS, recorder=recorder,
+                                      event_log=event_log)
+    steps = model.run() if profiler is None else profiler.runcall(model.run)
     final_grid = model.get_grid()
 
     # Calculate metrics
-    metrics = calculate_all_metrics(final_grid, steps)
+    metrics = calculate_all_metrics(final_grid, steps, metrics=config.METRICS)
 
     # Calculate ordered ratio percentage
     total_features = ordered_count + unordered_count
@@ -56,15 +119,24 @@ def run_single_simulation(args):
         'total_features': total_features,
         'grid_size': grid_size,
         'run_id': run_id,
+        'seed': seed,
         **metrics
     }
 
+    if recorder is not None:
+        result['time_series'] = recorder.rows(ordered_features=ordered_count, unordered_features=unordered_count,
+                                              grid_size=grid_size, run_id=run_id)
+
     return result
 
 
-def run_ratio_configuration(ordered_count, unordered_count, num_runs, grid_size, max_steps, use_parallel=True):
+def ratio_configuration_tasks(ordered_count, unordered_count, num_runs, grid_size, max_steps, engine='reference',
+                              seed_sequence=None):
     """
-    Run multiple simulations for a single ratio configuration using parallelization
+    Tasks of all simulations of a single ratio configuration
+
+    Every run gets its own seed spawned from seed_sequence, so its result
+    does not depend on which worker runs it or on how many there are.
 
     Args:
         ordered_count: Number of ordered features
@@ -72,82 +144,167 @@ def run_ratio_configuration(ordered_count, unordered_count, num_runs, grid_size,
         num_runs: Number of simulation runs
         grid_size: Size of square grid
         max_steps: Maximum simulation steps
-        use_parallel: Whether to use parallel processing (default: True)
+        engine: Model run engine ('reference', 'rejection_free' or 'jit')
+        seed_sequence: numpy SeedSequence of this configuration (default:
+            fresh entropy)
+
+    Returns:
+        List of tasks for run_task()
+    """
+    if seed_sequence is None:
+        seed_sequence = np.random.SeedSequence()
+    seeds = spawn_seeds(seed_sequence, num_runs)
+
+    return [(run_single_simulation, (ordered_count, unordered_count, grid_size, max_steps, engine, run_idx,
+                                     seeds[run_idx]))
+            for run_idx in range(num_runs)]
+
+
+def run_task(task):
+    """
+    Run one task of the flattened sweep
+
+    This function signature is designed for multiprocessing.Pool.imap_unordered()
+
+    Args:
+        task: Tuple of (function, args), function is run_single_simulation
+            or run_batched_simulations
 
     Returns:
         List of result dictionaries
     """
-    # Prepare arguments for all runs
-    args_list = [(ordered_count, unordered_count, grid_size, max_steps, run_idx) for run_idx in range(num_runs)]
+    function, args = task
+    results = function(args)
+    return results if isinstance(results, list) else [results]
+
+
+def run_tasks(tasks, num_workers):
+    """
+    Run all tasks of a sweep in one long-lived worker pool
+
+    Results stream back as tasks finish, so a slow run never holds up the
+    runs of other parameter values.
 
-    if use_parallel and num_runs > 1:
-        # Use parallel processing
-        num_workers = min(cpu_count(), num_runs)
+    Args:
+        tasks: List of tasks for run_task()
+        num_workers: Number of worker processes (1 = run in this process)
+
+    Yields:
+        List of result dictionaries of each finished task, in completion order
+    """
+    if num_workers > 1:
         with Pool(processes=num_workers) as pool:
-            results = pool.map(run_single_simulation, args_list)
+            yield from pool.imap_unordered(run_task, tasks)
     else:
-        # Sequential processing (fallback)
-        results = [run_single_simulation(args) for args in args_list]
+        for task in tasks:
+            yield run_task(task)
+
+
+def schedule_longest_first(tasks):
+    """
+    Order tasks by decreasing predicted run time (see scheduling.py)
+
+    Predictions use the mean steps_to_convergence per ratio configuration in
+    an earlier config.RAW_DATA_FILE. Unseen configurations fall back to
+    25 + unordered_features: with 5 features of 7 states every unordered
+    feature adds about 4% to the mean steps (measured: 65,000 with all five
+    ordered, 79,000 with all five unordered).
 
-    return results
+    Args:
+        tasks: List of tasks for run_task()
+
+    Returns:
+        The same tasks, most expensive first
+    """
+    history = historical_costs(config.RAW_DATA_FILE, ('ordered_features', 'unordered_features'))
+    keys = [(float(args[0]), float(args[1])) for _, args in tasks]
+    costs = predict_costs(keys, history, lambda key: 25 + key[1])
+    return longest_first(tasks, costs)
 
 
 def collect_all_data():
     """
     Run all simulations for all ratio configurations
 
+    All runs of the sweep go to one worker pool as a flat task list.
+
     Returns:
         List of all simulation results
     """
-    # Set random seed
+    # Fail before any worker starts on a mistyped engine
+    if config.ENGINE not in SWEEP_ENGINES:
+        raise ValueError(f"Unknown ENGINE '{config.ENGINE}' in config.py, expected one of {SWEEP_ENGINES}")
+
+    # Set random seed; every run draws from its own stream spawned from it
     set_random_seed(config.RANDOM_SEED)
+    root_seed = np.random.SeedSequence(config.RANDOM_SEED)
 
     all_results = []
     total_configs = len(config.RATIO_CONFIGS)
+    total_runs = total_configs * config.RUNS_PER_RATIO
 
     print(f"Starting data collection...")
     print(f"Total ratio configurations: {total_configs}")
     print(f"Runs per configuration: {config.RUNS_PER_RATIO}")
-    print(f"Total simulations: {total_configs * config.RUNS_PER_RATIO}")
+    print(f"Total simulations: {total_runs}")
     print(f"Grid size: {config.GRID_SIZE}x{config.GRID_SIZE}")
     print(f"Total features: {config.TOTAL_FEATURES}")
     print(f"States per feature: {config.STATES_PER_FEATURE}")
+    print(f"Engine: {config.ENGINE}")
+    print(f"Root seed entropy: {root_seed.entropy}")
+    print(f"Scheduling: {'longest first' if config.LONGEST_FIRST else 'sweep order'}")
     print(f"Parallel processing: {'Enabled' if config.USE_PARALLEL else 'Disabled'}")
     if config.USE_PARALLEL:
         print(f"CPU cores available: {cpu_count()}")
     print()
 
-    # Create progress bar for configurations
-    if config.SHOW_PROGRESS_BAR:
-        pbar = tqdm(config.RATIO_CONFIGS, desc="Processing configurations", unit="config")
-    else:
-        pbar = config.RATIO_CONFIGS
-
-    for config_idx, (ordered_count, unordered_count) in enumerate(pbar):
-        # Calculate ordered ratio percentage
-        ordered_ratio = (ordered_count / config.TOTAL_FEATURES * 100)
-
-        # Update progress bar description
-        if config.SHOW_PROGRESS_BAR:
-            pbar.set_description(f"Ordered={ordered_count}, Unordered={unordered_count} ({ordered_ratio:.0f}%)")
-
-        # Run simulations for this configuration
-        results = run_ratio_configuration(
+    # Flatten the sweep: one task per run
+    tasks = []
+    seed_sequences = root_seed.spawn(len(config.RATIO_CONFIGS))
+    for (ordered_count, unordered_count), seed_sequence in zip(config.RATIO_CONFIGS, seed_sequences):
+        tasks.extend(ratio_configuration_tasks(
             ordered_count,
             unordered_count,
             config.RUNS_PER_RATIO,
             config.GRID_SIZE,
             config.MAX_STEPS,
-            use_parallel=config.USE_PARALLEL
-        )
-
-        all_results.extend(results)
-
-        # Periodic save
-        if (config_idx + 1) % config.SAVE_INTERVAL == 0:
-            save_raw_data(all_results)
-            if not config.SHOW_PROGRESS_BAR:
-                print(f"Saved progress: {config_idx + 1}/{total_configs} configurations")
+            engine=config.ENGINE,
+            seed_sequence=seed_sequence
+        ))
+    num_workers = min(cpu_count(), len(tasks)) if config.USE_PARALLEL else 1
+
+    # Dispatch the most expensive runs first so no long run is left for the end
+    if config.LONGEST_FIRST:
+        tasks = schedule_longest_first(tasks)
+
+    # Progress per finished run
+    pbar = tqdm(total=total_runs, desc="Running simulations", unit="run") if config.SHOW_PROGRESS_BAR else None
+
+    # Results are appended to the files as they arrive (see result_writer.py)
+    raw_writer = ResultWriter(config.RAW_DATA_FILE, config.SYNC_SECONDS, config.SYNC_BYTES)
+    series_writer = ResultWriter(config.TIME_SERIES_FILE, config.SYNC_SECONDS, config.SYNC_BYTES)
+
+    with raw_writer, series_writer:
+        for results in run_tasks(tasks, num_workers):
+            # Time-series rows travel with the results, keep them out of raw_data.csv
+            series_writer.write([row for result in results for row in result.pop('time_series', ())])
+            synced = raw_writer.write(results)
+            all_results.extend(results)
+
+            if pbar is not None:
+                pbar.update(len(results))
+                last = results[-1]
+                pbar.set_postfix_str(f"Ordered={last['ordered_features']}, Unordered={last['unordered_features']} "
+                                     f"({last['ordered_ratio']:.0f}%)")
+            elif synced:
+                print(f"Saved progress: {len(all_results)}/{total_runs} runs")
+
+    if pbar is not None:
+        pbar.close()
+
+    # Completion order depends on the workers, store runs in sweep order
+    order = {tuple(ratio): idx for idx, ratio in enumerate(config.RATIO_CONFIGS)}
+    all_results.sort(key=lambda r: (order[(r['ordered_features'], r['unordered_features'])], r['run_id']))
 
     print("\nData collection complete!")
     return all_results
@@ -157,6 +314,9 @@ def save_raw_data(results, filename=None):
     """
     Save raw simulation results to CSV
 
+    The file is replaced in one step, so readers see either the old or the
+    new contents (collect_all_data appends to the same file while running).
+
     Args:
         results: List of result dictionaries
         filename: Output filename (default: config.RAW_DATA_FILE)
@@ -174,14 +334,33 @@ def save_raw_data(results, filename=None):
     # Write to CSV
     fieldnames = results[0].keys()
 
-    with open(filename, 'w', newline='') as csvfile:
+    temporary = f"{filename}.tmp"
+    with open(temporary, 'w', newline='') as csvfile:
         writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
         writer.writeheader()
         writer.writerows(results)
+    os.replace(temporary, filename)
 
     print(f"Saved {len(results)} results to {filename}")
 
 
+def metric_values(results, metric):
+    """
+    Values of one metric over a group of results
+
+    Args:
+        results: List of result dictionaries
+        metric: Metric name
+
+    Returns:
+        List of values, or None if some result lacks the metric (not
+        selected in config.METRICS, or raw data from an older run)
+    """
+    if all(metric in r for r in results):
+        return [r[metric] for r in results]
+    return None
+
+
 def aggregate_data(results):
     """
     Aggregate results by ratio configuration
@@ -220,9 +399,6 @@ def aggregate_data(results):
     for (ordered_count, unordered_count), group_results in groups.items():
         # Extract metric values
         steps = [r['steps_to_convergence'] for r in group_results]
-        unique_cultures = [r['unique_cultures'] for r in group_results]
-        largest_domain = [r['largest_domain_percentage'] for r in group_results]
-        avg_distance = [r['avg_cultural_distance'] for r in group_results]
 
         # Calculate ordered ratio percentage
         ordered_ratio = (ordered_count / config.TOTAL_FEATURES * 100)
@@ -240,25 +416,38 @@ def aggregate_data(results):
             'steps_std': np.std(steps),
             'steps_min': np.min(steps),
             'steps_max': np.max(steps),
-
-            # Unique cultures
-            'unique_cultures_mean': np.mean(unique_cultures),
-            'unique_cultures_std': np.std(unique_cultures),
-            'unique_cultures_min': np.min(unique_cultures),
-            'unique_cultures_max': np.max(unique_cultures),
-
-            # Largest domain percentage
-            'largest_domain_mean': np.mean(largest_domain),
-            'largest_domain_std': np.std(largest_domain),
-
-            # Average cultural distance
-            'avg_distance_mean': np.mean(avg_distance),
-            'avg_distance_std': np.std(avg_distance),
-
-            # Probability of global consensus
-            'prob_global_consensus': sum(1 for uc in unique_cultures if uc == 1) / len(unique_cultures)
         }
 
+        # Statistics of the metrics this sweep selected (config.METRICS)
+        unique_cultures = metric_values(group_results, 'unique_cultures')
+        if unique_cultures is not None:
+            agg_result['unique_cultures_mean'] = np.mean(unique_cultures)
+            agg_result['unique_cultures_std'] = np.std(unique_cultures)
+            agg_result['unique_cultures_min'] = np.min(unique_cultures)
+            agg_result['unique_cultures_max'] = np.max(unique_cultures)
+
+        largest_domain = metric_values(group_results, 'largest_domain_percentage')
+        if largest_domain is not None:
+            agg_result['largest_domain_mean'] = np.mean(largest_domain)
+            agg_result['largest_domain_std'] = np.std(largest_domain)
+
+        avg_distance = metric_values(group_results, 'avg_cultural_distance')
+        if avg_distance is not None:
+            agg_result['avg_distance_mean'] = np.mean(avg_distance)
+            agg_result['avg_distance_std'] = np.std(avg_distance)
+
+        # Probability of global consensus
+        global_consensus = metric_values(group_results, 'global_consensus')
+        if unique_cultures is not None:
+            agg_result['prob_global_consensus'] = sum(1 for uc in unique_cultures if uc == 1) / len(unique_cultures)
+        elif global_consensus is not None:
+            agg_result['prob_global_consensus'] = np.mean(global_consensus)
+
+        num_domains = metric_values(group_results, 'num_domains')
+        if num_domains is not None:
+            agg_result['num_domains_mean'] = np.mean(num_domains)
+            agg_result['num_domains_std'] = np.std(num_domains)
+
         aggregated.append(agg_result)
 
     # Sort by ordered ratio for consistent ordering
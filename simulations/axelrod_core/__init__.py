@@ -0,0 +1,10 @@
+"""
+Shared Axelrod simulation package of the case studies
+
+Holds the engine (engine.py) with its transition rules, initializers,
+topologies, random source and compiled kernels, the model configurations
+used by more than one study, and the sweep tooling (metrics, recorder,
+event log, result writer, scheduling). Every study imports it as
+axelrod_core; its entry points put the simulations folder on sys.path, and
+azure_deploy.py uploads the package next to each study folder.
+"""
@@ -0,0 +1,51 @@
+"""
+Core Axelrod cultural dissemination model implementation
+"""
+from .engine import AxelrodEngine
+from .initializers import GridInitializer, UniformInitializer
+from .transition_rules import TransitionRule
+
+
+class AxelrodModel(AxelrodEngine):
+    """
+    Implementation of Axelrod's model of cultural dissemination
+
+    The classic model on the shared engine: uniform random initial traits,
+    every active pair interacts and the receiver copies the dominator's state.
+    """
+
+    def __init__(self, grid_size, F, q, max_steps=1000000, engine='reference', initial_grid=None,
+                 topology=None, seed=None, track_cultures=False, recorder=None, event_log=None):
+        """
+        Initialize the Axelrod model
+
+        Args:
+            grid_size: Size of the square grid (grid_size x grid_size)
+            F: Number of cultural features per agent
+            q: Number of possible states per feature
+            max_steps: Maximum number of simulation steps
+            engine: Run engine, one of engine.ENGINES
+            initial_grid: Optional (grid_size, grid_size, F) array to start
+                from instead of a random grid
+            topology: Optional Topology with grid_size^2 agents
+                (default: open von Neumann lattice)
+            seed: Seed or numpy Generator for all random draws of this model
+                (default: derived from the global np.random state)
+            track_cultures: Keep live culture counts for get_observables()
+            recorder: Optional TimeSeriesRecorder sampling the observables
+                during run() (see recorder.py)
+            event_log: Optional EventLog receiving every adoption during
+                run() (see event_log.py)
+        """
+        self.F = F
+        self.q = q
+
+        if initial_grid is None:
+            initializer = UniformInitializer(q)
+        else:
+            initializer = GridInitializer(initial_grid)
+
+        super().__init__(grid_size, F, q, rule=TransitionRule.full_adoption(F),
+                         initializer=initializer, max_steps=max_steps, engine=engine,
+                         topology=topology, seed=seed, track_cultures=track_cultures,
+                         recorder=recorder, event_log=event_log)
@@ -0,0 +1,246 @@
+"""
+Vectorized multi-replica Axelrod model
+
+Runs R independent replicas of AxelrodModel as one (R, grid_size, grid_size, F)
+array and advances every replica that has not reached an absorbing state with
+one set of NumPy operations per step.
+"""
+import numpy as np
+from .axelrod_model import AxelrodModel
+from .culture import grid_dtype, pack_cultures
+from .rng import make_generator
+from .topology import lattice_topology
+
+
+class BatchedAxelrodModel:
+    """
+    R independent Axelrod replicas advanced together
+
+    Each replica follows exactly the AxelrodModel step rule (random agent,
+    random neighbor, copy one differing feature with a 50/50 dominator) and
+    retires individually when it absorbs or hits max_steps.
+    Once only a few replicas are left, the per-step NumPy overhead outweighs
+    the batching, so the remaining ones are finished with AxelrodModel.
+    """
+
+    def __init__(self, num_replicas, grid_size, F, q, max_steps=1000000, tail_size=8, topology=None,
+                 seed=None):
+        """
+        Initialize the batched model
+
+        Args:
+            num_replicas: Number of independent replicas (R)
+            grid_size: Size of the square grid (grid_size x grid_size)
+            F: Number of cultural features per agent
+            q: Number of possible states per feature
+            max_steps: Maximum number of simulation steps per replica
+            tail_size: Finish the last tail_size live replicas one by one
+                with AxelrodModel (0 = always stay batched)
+            topology: Optional Topology with grid_size^2 agents
+                (default: open von Neumann lattice)
+            seed: Seed or numpy Generator for all random draws of this model
+                (default: derived from the global np.random state)
+        """
+        if topology is None:
+            topology = lattice_topology(grid_size)
+        if topology.num_agents != grid_size * grid_size:
+            raise ValueError(f"Topology has {topology.num_agents} agents, expected {grid_size * grid_size}")
+
+        self.num_replicas = num_replicas
+        self.grid_size = grid_size
+        self.F = F
+        self.q = q
+        self.max_steps = max_steps
+        self.tail_size = tail_size
+        self.topology = topology
+        self.num_agents = grid_size * grid_size
+        self.generator = make_generator(seed)
+
+        # Initialize all grids with random features in the smallest unsigned dtype
+        # Shape: (num_replicas, grid_size, grid_size, F)
+        self.grids = self.generator.integers(
+            0, q, size=(num_replicas, grid_size, grid_size, F), dtype=grid_dtype(q)
+        )
+
+        # Flat (replica, agent, feature) view, agent index = i * grid_size + j
+        self.agents = self.grids.reshape(num_replicas, self.num_agents, F)
+
+        self._build_neighbor_tables()
+        self._build_edge_cache()
+
+        # Steps to convergence per replica (filled in by run())
+        self.steps = np.zeros(num_replicas, dtype=np.int64)
+
+    def _build_neighbor_tables(self):
+        """
+        Take rectangular neighbor and edge tables from the topology
+
+        Sets:
+            degree: (num_agents,) number of neighbors per agent
+            neighbors: (num_agents, max_degree) neighbor indices, padded with -1
+            neighbor_edges: (num_agents, max_degree) matching edge ids, padded with -1
+            edges: (num_edges, 2) flat agent indices of each edge
+        """
+        self.degree = self.topology.degree
+        self.neighbors, self.neighbor_edges = self.topology.padded()
+        self.edges = self.topology.edges
+
+    def _build_edge_cache(self):
+        """
+        Compute shared-feature counts for every edge of every replica
+
+        Sets:
+            edge_overlap: (num_replicas, num_edges) shared feature counts
+            active_edges: (num_replicas,) edges with 0 < overlap < F
+        """
+        self.edge_overlap = np.sum(
+            self.agents[:, self.edges[:, 0]] == self.agents[:, self.edges[:, 1]], axis=2
+        )
+        self.active_edges = np.count_nonzero(
+            (self.edge_overlap > 0) & (self.edge_overlap < self.F), axis=1
+        )
+
+    def _step(self, live):
+        """
+        Perform one simulation step in every live replica
+
+        Args:
+            live: Array of replica indices that are still running
+        """
+        F = self.F
+
+        # One block of uniforms per step: agent, neighbor slot, feature, dominator
+        draws = self.generator.random((4, len(live)))
+
+        # Select random agent and random neighbor slot in every replica
+        agent = (draws[0] * self.num_agents).astype(np.int64)
+        slot = (draws[1] * self.degree[agent]).astype(np.int64)
+        neighbor = self.neighbors[agent, slot]
+        edge = self.neighbor_edges[agent, slot]
+
+        # Only replicas whose pair shares some but not all features interact
+        shared = self.edge_overlap[live, edge]
+        interacting = (shared > 0) & (shared < F)
+        if not interacting.any():
+            return
+
+        replica = live[interacting]
+        agent = agent[interacting]
+        neighbor = neighbor[interacting]
+        shared = shared[interacting]
+        draws = draws[2:, interacting]
+
+        # Select a random differing feature: the k-th True in the difference mask
+        differing = self.agents[replica, agent] != self.agents[replica, neighbor]
+        k = (draws[0] * (F - shared)).astype(np.int64)
+        feature = np.argmax(np.cumsum(differing, axis=1) > k[:, None], axis=1)
+
+        # Randomly select dominator (50/50 chance)
+        agent_adopts = draws[1] < 0.5
+        receiver = np.where(agent_adopts, agent, neighbor)
+        dominator = np.where(agent_adopts, neighbor, agent)
+        self.agents[replica, receiver, feature] = self.agents[replica, dominator, feature]
+
+        # Recompute the edges touching each receiver
+        incident_edges = self.neighbor_edges[receiver]
+        incident_neighbors = self.neighbors[receiver]
+        valid = incident_edges >= 0
+        safe_edges = np.where(valid, incident_edges, 0)
+        safe_neighbors = np.where(valid, incident_neighbors, 0)
+
+        old_overlap = self.edge_overlap[replica[:, None], safe_edges]
+        new_overlap = np.sum(
+            self.agents[replica, receiver][:, None, :] == self.agents[replica[:, None], safe_neighbors],
+            axis=2
+        )
+
+        was_active = (old_overlap > 0) & (old_overlap < F) & valid
+        is_active = (new_overlap > 0) & (new_overlap < F) & valid
+        self.active_edges[replica] += np.sum(is_active, axis=1) - np.sum(was_active, axis=1)
+
+        rows = np.broadcast_to(replica[:, None], valid.shape)
+        self.edge_overlap[rows[valid], incident_edges[valid]] = new_overlap[valid]
+
+    def run(self):
+        """
+        Run all replicas until each reaches an absorbing state or max steps
+
+        steps_to_convergence follows AxelrodModel: an absorbed replica is
+        credited with the grid_size^2 confirmation steps after its last change.
+
+        Returns:
+            numpy array of shape (num_replicas,) with steps per replica
+        """
+        live = np.arange(self.num_replicas)
+        step_count = 0
+
+        while len(live) > 0:
+            # Retire replicas that have absorbed
+            absorbed = self.active_edges[live] == 0
+            if absorbed.any():
+                self.steps[live[absorbed]] = min(step_count + self.num_agents, self.max_steps)
+                live = live[~absorbed]
+
+            if step_count >= self.max_steps:
+                self.steps[live] = self.max_steps
+                break
+
+            if 0 < len(live) <= self.tail_size:
+                self._finish_sequentially(live, step_count)
+                break
+
+            if len(live) > 0:
+                step_count += 1
+                self._step(live)
+
+        return self.steps.copy()
+
+    def _finish_sequentially(self, live, step_count):
+        """
+        Continue the remaining replicas with the scalar AxelrodModel
+
+        The dynamics are Markov in the grid state, so continuing from the
+        current grid with the remaining step budget and adding step_count
+        gives the same steps_to_convergence distribution.
+
+        Args:
+            live: Replica indices still running
+            step_count: Steps already taken by every live replica
+        """
+        for replica in live:
+            model = AxelrodModel(
+                self.grid_size, self.F, self.q,
+                max_steps=self.max_steps - step_count,
+                initial_grid=self.grids[replica],
+                topology=self.topology,
+                seed=self.generator
+            )
+            self.steps[replica] = step_count + model.run()
+            self.grids[replica] = model.get_grid()
+
+    def get_grid(self, replica):
+        """
+        Get the current grid state of one replica
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, F)
+        """
+        return self.grids[replica].copy()
+
+    def get_grids(self):
+        """
+        Get the current grid state of all replicas
+
+        Returns:
+            numpy array of shape (num_replicas, grid_size, grid_size, F)
+        """
+        return self.grids.copy()
+
+    def get_culture_codes(self):
+        """
+        Get packed base-q culture codes of all replicas
+
+        Returns:
+            uint64 numpy array of shape (num_replicas, grid_size * grid_size)
+        """
+        return pack_cultures(self.agents, self.q)
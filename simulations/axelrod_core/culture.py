@@ -0,0 +1,85 @@
+"""
+Compact storage of cultural traits
+
+Grids are stored in the smallest unsigned dtype that holds every trait value,
+and a whole culture (one agent's F traits) can be packed into a single uint64
+base-q code, so identity checks and unique-culture counting become integer
+comparisons.
+"""
+import numpy as np
+
+# Unsigned dtypes tried in order of size
+_GRID_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def grid_dtype(q):
+    """
+    Smallest unsigned dtype that can store trait values 0..q-1
+
+    Args:
+        q: Number of possible states per feature
+
+    Returns:
+        numpy dtype
+    """
+    for dtype in _GRID_DTYPES:
+        if q - 1 <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise ValueError(f"q={q} does not fit in 64 bits")
+
+
+def can_pack(F, q):
+    """
+    Check if cultures with F features of q states fit in one uint64 code
+
+    Returns:
+        True if q^F <= 2^64
+    """
+    return q ** F <= 2 ** 64
+
+
+def pack_cultures(agents, q):
+    """
+    Encode every culture as one base-q integer
+
+    code = sum(agents[:, f] * q^(F-1-f)), so two agents share a code
+    exactly when they share all F features.
+
+    Args:
+        agents: Integer array of shape (..., F) with values in 0..q-1
+        q: Number of possible states per feature
+
+    Returns:
+        uint64 array of shape (...)
+    """
+    agents = np.asarray(agents)
+    F = agents.shape[-1]
+    if not can_pack(F, q):
+        raise ValueError(f"q^F = {q}^{F} does not fit in 64 bits")
+
+    codes = np.zeros(agents.shape[:-1], dtype=np.uint64)
+    base = np.uint64(q)
+    for f in range(F):
+        codes = codes * base + agents[..., f].astype(np.uint64)
+    return codes
+
+
+def unpack_cultures(codes, F, q):
+    """
+    Decode base-q culture codes back into feature arrays
+
+    Args:
+        codes: uint64 array of culture codes
+        F: Number of features per agent
+        q: Number of possible states per feature
+
+    Returns:
+        Array of shape codes.shape + (F,) in grid_dtype(q)
+    """
+    codes = np.array(codes, dtype=np.uint64)
+    agents = np.empty(codes.shape + (F,), dtype=grid_dtype(q))
+    base = np.uint64(q)
+    for f in range(F - 1, -1, -1):
+        agents[..., f] = codes % base
+        codes //= base
+    return agents
@@ -0,0 +1,686 @@
+"""
+Shared Axelrod simulation engine
+
+One engine runs every model variant of the case studies. What differs between
+them is passed in as two plug-ins:
+- a TransitionRule (transition_rules.py): full adoption, ordered one-step or
+  mixed per feature, with or without similarity-weighted interaction
+- an initializer (initializers.py): uniform, correlated or a given grid
+The run engines, edge-overlap cache, random source and culture codes are
+implemented once here, so an optimization made in this module reaches every
+study. The case-study model classes are thin configurations of AxelrodEngine.
+"""
+import math
+import numpy as np
+from .culture import grid_dtype, pack_cultures
+from .initializers import UniformInitializer
+from .jit_kernel import NUMBA_AVAILABLE, advance_frontier, run_until_absorbed, seed_kernel
+from .observables import CultureTable
+from .recorder import NEVER
+from .rng import BufferedRandom
+from .topology import lattice_topology
+from .transition_rules import TransitionRule
+
+# Available run engines:
+# - 'reference': draw a random (agent, neighbor) pair every step
+# - 'rejection_free': n-fold way, sample only active pairs and add the skipped
+#   failed steps as a geometric draw (same steps_to_convergence distribution)
+# - 'jit': the reference loop compiled with Numba (falls back to 'reference'
+#   when Numba is not installed)
+ENGINES = ('reference', 'rejection_free', 'jit')
+
+# Up to this many features, _interact finds the differing features with a
+# plain Python scan of the flat traits; beyond it one np.where over the two
+# rows is cheaper (crossover measured at F = 10..12)
+SCALAR_MAX_F = 10
+
+
+class AxelrodEngine:
+    """
+    Axelrod cultural dissemination dynamics with pluggable transition rule
+    and initializer
+    """
+
+    def __init__(self, grid_size, num_features, num_states, rule=None, initializer=None,
+                 max_steps=1000000, engine='reference', topology=None, seed=None, track_cultures=False,
+                 recorder=None, event_log=None):
+        """
+        Initialize the engine
+
+        Args:
+            grid_size: Size of the square grid (grid_size x grid_size)
+            num_features: Number of cultural features per agent
+            num_states: Largest number of states of any feature (fixes the
+                grid dtype and the culture code base)
+            rule: TransitionRule for num_features features
+                (default: full adoption, every active pair interacts)
+            initializer: Object with an initialize(generator, grid_size,
+                num_features, dtype) method (default: UniformInitializer(num_states))
+            max_steps: Maximum number of simulation steps
+            engine: Run engine, one of ENGINES
+            topology: Optional Topology with grid_size^2 agents
+                (default: open von Neumann lattice)
+            seed: Seed or numpy Generator for all random draws of this model
+                (default: derived from the global np.random state)
+            track_cultures: Keep a CultureTable of the live cultures, updated
+                on every adoption, for O(1) observables during the run
+                (see get_observables)
+            recorder: Optional TimeSeriesRecorder sampling the observables
+                during run() (implies track_cultures; the compiled loops stop
+                at every sample, so a seed gives the same run either way)
+            event_log: Optional EventLog receiving every adoption during
+                run() (the 'jit' engine then runs the Python reference loop,
+                which has the same dynamics but a different random stream)
+        """
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {ENGINES}")
+
+        if rule is None:
+            rule = TransitionRule.full_adoption(num_features)
+        if rule.num_features != num_features:
+            raise ValueError(f"Transition rule has {rule.num_features} features, expected {num_features}")
+        if initializer is None:
+            initializer = UniformInitializer(num_states)
+
+        if topology is None:
+            topology = lattice_topology(grid_size)
+        if topology.num_agents != grid_size * grid_size:
+            raise ValueError(f"Topology has {topology.num_agents} agents, expected {grid_size * grid_size}")
+
+        self.grid_size = grid_size
+        self.num_features = num_features
+        self.num_states = num_states
+        self.rule = rule
+        self.initializer = initializer
+        self.max_steps = max_steps
+        self.engine = engine
+        self.topology = topology
+        self.num_agents = grid_size * grid_size
+        self.step_count = 0
+
+        # Per-instance random source with block-buffered scalar draws
+        self.rng = BufferedRandom(self.num_agents, seed)
+
+        # Initialize grid in the smallest unsigned dtype that holds all states
+        # Shape: (grid_size, grid_size, num_features)
+        self.grid = initializer.initialize(
+            self.rng.generator, grid_size, num_features, grid_dtype(num_states)
+        )
+
+        # Flat (agent, feature) view of the grid, agent index = i * grid_size + j
+        self.agents = self.grid.reshape(self.num_agents, num_features)
+
+        # Flat trait view for scalar access without NumPy temporaries:
+        # trait f of agent a is _traits[a * num_features + f]
+        self._traits = memoryview(self.agents.reshape(-1))
+        self._scalar_features = num_features <= SCALAR_MAX_F
+        self._has_order = rule.ordered.tolist()
+        self._weighted = rule.weighted
+
+        self._build_neighbor_tables()
+
+        # Edge-overlap cache: shared feature count for every lattice edge and
+        # the number of active edges (0 < overlap < num_features)
+        self._build_edge_cache()
+
+        # Active-edge frontier of the rejection-free engine, maintained by
+        # _update_edge_cache while a rejection-free run is in progress
+        self._frontier_view = None
+
+        # Optional interning table of the live cultures (None = not tracked)
+        self.recorder = recorder
+        self.event_log = event_log
+        if track_cultures or recorder is not None:
+            self.cultures = CultureTable(self.agents, num_states)
+        else:
+            self.cultures = None
+
+    def _build_neighbor_tables(self):
+        """
+        CSR neighbor tables as Python lists for fast scalar access in the step loop
+
+        Sets:
+            _offsets, _degree, _neighbor_ids, _neighbor_edges
+        """
+        self._offsets = self.topology.offsets.tolist()
+        self._degree = self.topology.degree.tolist()
+        self._neighbor_ids = self.topology.neighbor_ids.tolist()
+        self._neighbor_edges = self.topology.neighbor_edges.tolist()
+
+    def _build_edge_cache(self):
+        """
+        Compute the initial shared-feature count of every topology edge
+
+        Sets:
+            edges: int array of shape (num_edges, 2) with flat agent indices
+            edge_overlap: int array of shared feature counts per edge
+            active_edges: number of edges with 0 < overlap < num_features
+        """
+        self.edges = self.topology.edges
+        self.edge_overlap = np.sum(
+            self.agents[self.edges[:, 0]] == self.agents[self.edges[:, 1]], axis=1
+        )
+        self.active_edges = int(np.count_nonzero(
+            (self.edge_overlap > 0) & (self.edge_overlap < self.num_features)
+        ))
+        self._overlap = memoryview(self.edge_overlap)
+
+    def _update_edge_cache(self, agent, feature_idx, old_value, new_value):
+        """
+        Update overlaps of the edges touching an agent after it changed one
+        feature from old_value to new_value
+        """
+        F = self.num_features
+        traits = self._traits
+        overlap = self._overlap
+        for k in range(self._offsets[agent], self._offsets[agent + 1]):
+            neighbor = self._neighbor_ids[k]
+            edge = self._neighbor_edges[k]
+            neighbor_value = traits[neighbor * F + feature_idx]
+            delta = (neighbor_value == new_value) - (neighbor_value == old_value)
+            if delta == 0:
+                continue
+
+            before = overlap[edge]
+            after = before + delta
+            overlap[edge] = after
+
+            was_active = 0 < before < F
+            is_active = 0 < after < F
+            if was_active != is_active:
+                self.active_edges += 1 if is_active else -1
+                if self._frontier_view is not None:
+                    self._move_frontier_edge(edge, is_active)
+
+    def get_neighbors(self, i, j):
+        """
+        Get neighbors of position (i, j) from the topology
+        (up, down, left, right on the default lattice)
+
+        Returns:
+            List of (row, col) tuples for valid neighbors
+        """
+        neighbors = self.topology.neighbors_of(i * self.grid_size + j)
+        return [(int(n) // self.grid_size, int(n) % self.grid_size) for n in neighbors]
+
+    def cultural_similarity(self, agent1_features, agent2_features):
+        """
+        Calculate cultural similarity between two agents
+
+        Returns:
+            Number of shared features (0 to num_features)
+        """
+        return np.sum(agent1_features == agent2_features)
+
+    def can_interact(self, agent1_features, agent2_features):
+        """
+        Check if two agents can interact (share some but not all features)
+
+        Returns:
+            Tuple (can_interact: bool, shared_features: int)
+        """
+        shared = self.cultural_similarity(agent1_features, agent2_features)
+        # Can interact if they share some features but are not identical
+        return (0 < shared < self.num_features), shared
+
+    def is_absorbing_state(self):
+        """
+        Check if the system has reached an absorbing state
+        (no more interactions possible)
+
+        Uses the edge-overlap cache, so this is O(1)
+
+        Returns:
+            True if absorbing state reached, False otherwise
+        """
+        return self.active_edges == 0
+
+    def simulation_step(self):
+        """
+        Perform one simulation step
+
+        Returns:
+            True if simulation should continue, False if absorbing state reached
+        """
+        # Select random agent
+        agent_idx = self.rng.agent()
+
+        # Select random neighbor: one lookup in the CSR tables
+        k = self._offsets[agent_idx] + self.rng.below(self._degree[agent_idx])
+        neighbor_idx = self._neighbor_ids[k]
+        edge = self._neighbor_edges[k]
+
+        # Shared feature count comes straight from the edge cache
+        shared = self._overlap[edge]
+
+        if not (0 < shared < self.num_features):
+            return True  # Failed interaction, continue simulation
+
+        # Probabilistic interaction based on cultural overlap
+        if self._weighted and self.rng.uniform() > shared / self.num_features:
+            return True  # No interaction occurred
+
+        self._interact(agent_idx, neighbor_idx)
+
+        return self.active_edges > 0
+
+    def _interact(self, agent_idx, neighbor_idx):
+        """
+        Let two agents that can interact exchange one differing feature
+
+        Args:
+            agent_idx: Flat index of the selected agent
+            neighbor_idx: Flat index of the selected neighbor
+
+        Returns:
+            Flat index of the agent that changed
+        """
+        F = self.num_features
+        traits = self._traits
+        agent_base = agent_idx * F
+        neighbor_base = neighbor_idx * F
+
+        # Find differing features
+        if self._scalar_features:
+            differing_features = [f for f in range(F) if traits[agent_base + f] != traits[neighbor_base + f]]
+        else:
+            differing_features = np.where(self.agents[agent_idx] != self.agents[neighbor_idx])[0].tolist()
+
+        # Select random differing feature
+        feature_idx = differing_features[self.rng.below(len(differing_features))]
+
+        # Randomly select dominator (50/50 chance)
+        if self.rng.uniform() < 0.5:
+            # Agent adopts from neighbor
+            receiver_idx = agent_idx
+            dominator_state = traits[neighbor_base + feature_idx]
+        else:
+            # Neighbor adopts from agent
+            receiver_idx = neighbor_idx
+            dominator_state = traits[agent_base + feature_idx]
+
+        position = receiver_idx * F + feature_idx
+        receiver_state = traits[position]
+
+        # Apply the transition rule of the feature
+        if not self._has_order[feature_idx]:
+            # Nominal feature: complete adoption from dominator
+            new_state = dominator_state
+        elif dominator_state > receiver_state:
+            # Ordered feature: move one step up toward dominator
+            new_state = receiver_state + 1
+        else:
+            # Ordered feature: move one step down (states differ, so dominator is lower)
+            new_state = receiver_state - 1
+
+        traits[position] = new_state
+        self._update_edge_cache(receiver_idx, feature_idx, receiver_state, new_state)
+        if self.cultures is not None:
+            self.cultures.update(receiver_idx, feature_idx, receiver_state, new_state)
+        if self.event_log is not None:
+            self.event_log.record(self.step_count, receiver_idx, feature_idx, new_state)
+
+        return receiver_idx
+
+    def _build_frontier(self):
+        """
+        Group the active edges by geometry class (rejection-free engine)
+
+        The reference engine selects edge (a, b) in a step with probability
+        (1/deg(a) + 1/deg(b)) / grid_size^2, so edges with the same degree
+        pair share a selection rate. Every class owns a segment of one flat
+        edge array and keeps its active edges at the front of it; an edge
+        only ever belongs to its own class, so entering or leaving the
+        frontier is an O(1) swap within the segment.
+
+        Sets:
+            _geometry_rate: float array, selection rate of one edge per class
+            _class_start: int64 array, segment start of every class
+            _class_count: int64 array, number of active edges of every class
+            _frontier: int64 array of edge ids, active ones first in each segment
+            _edge_geometry: int64 array, class of every edge
+            _edge_slot: int64 array, position of every active edge in
+                _frontier (-1 for inactive edges)
+            _edge_a, _edge_b: int64 arrays, endpoints of every edge
+        """
+        degree = self.topology.degree
+        low = np.minimum(degree[self.edges[:, 0]], degree[self.edges[:, 1]]).astype(np.int64)
+        high = np.maximum(degree[self.edges[:, 0]], degree[self.edges[:, 1]]).astype(np.int64)
+
+        # Few distinct degree pairs: number them in order of their key
+        base = self.topology.max_degree + 1
+        keys, geometry = np.unique(low * base + high, return_inverse=True)
+        geometry = geometry.reshape(-1).astype(np.int64)
+        self._geometry_rate = (1 / (keys // base) + 1 / (keys % base)) / self.num_agents
+
+        capacity = np.bincount(geometry, minlength=len(keys))
+        self._class_start = np.concatenate(([0], np.cumsum(capacity)[:-1])).astype(np.int64)
+
+        # Sort edges by class, active before inactive within a class
+        active = (self.edge_overlap > 0) & (self.edge_overlap < self.num_features)
+        self._frontier = np.lexsort((~active, geometry)).astype(np.int64)
+        self._class_count = np.bincount(geometry[active], minlength=len(keys)).astype(np.int64)
+        self._edge_slot = np.full(len(self.edges), -1, dtype=np.int64)
+        self._edge_slot[self._frontier] = np.arange(len(self.edges))
+        self._edge_slot[~active] = -1
+
+        self._edge_geometry = geometry
+        self._edge_a = np.ascontiguousarray(self.edges[:, 0], dtype=np.int64)
+        self._edge_b = np.ascontiguousarray(self.edges[:, 1], dtype=np.int64)
+
+        # Python loop: scalar access through memoryviews, class rates as a list
+        self._frontier_view = memoryview(self._frontier)
+        self._slot_view = memoryview(self._edge_slot)
+        self._count_view = memoryview(self._class_count)
+        self._start_view = memoryview(self._class_start)
+        self._rate_view = memoryview(self._geometry_rate)
+        self._geometry_view = memoryview(self._edge_geometry)
+        self._sum_class_rates()
+
+    def _sum_class_rates(self):
+        """Recompute the rate of every class and their total from the counts"""
+        self._class_rate = (self._class_count * self._geometry_rate).tolist()
+        self._total_rate = sum(self._class_rate)
+
+    def _move_frontier_edge(self, edge, is_active):
+        """
+        Add an edge that became active to the frontier, or remove one that
+        became inactive, and update the rate of its class
+        """
+        geometry = self._geometry_view[edge]
+        frontier = self._frontier_view
+        slot = self._slot_view
+        count = self._count_view[geometry]
+        end = self._start_view[geometry] + count
+
+        if is_active:
+            frontier[end] = edge
+            slot[edge] = end
+            count += 1
+        else:
+            # Swap-with-last removal
+            last = frontier[end - 1]
+            frontier[slot[edge]] = last
+            slot[last] = slot[edge]
+            slot[edge] = -1
+            count -= 1
+
+        self._count_view[geometry] = count
+        self._class_rate[geometry] = count * self._rate_view[geometry]
+        # Summed afresh over the few classes: a running += total would drift
+        # by more than the rate of the last active edges on large grids
+        self._total_rate = sum(self._class_rate)
+
+    def _sample_active_edge(self):
+        """
+        Select an active edge with probability proportional to its rate
+
+        Returns:
+            Edge id
+        """
+        target = self.rng.uniform() * self._total_rate
+        last_class = 0
+
+        # Cumulative scan over the class rates, then uniform within the class
+        for geometry, class_rate in enumerate(self._class_rate):
+            if class_rate <= 0.0:
+                continue
+            last_class = geometry
+            if target < class_rate:
+                index = min(int(target / self._rate_view[geometry]), self._count_view[geometry] - 1)
+                return self._frontier_view[self._start_view[geometry] + index]
+            target -= class_rate
+
+        # Floating point round-off: fall back to the last non-empty class
+        index = self.rng.below(self._count_view[last_class])
+        return self._frontier_view[self._start_view[last_class] + index]
+
+    def _start_frontier(self):
+        """Set up a rejection-free run: frontier, step counter and sampling"""
+        self._build_frontier()
+        self.step_count = 0
+        self._next_sample = self.recorder.next_step if self.recorder is not None else NEVER
+        self._wait = 0.0
+
+    def _finish_frontier(self):
+        """End a rejection-free run and stop maintaining the frontier"""
+        self._frontier_view = None
+
+    def _advance_frontier(self, max_events=NEVER):
+        """
+        Rejection-free (n-fold way) events in Python
+
+        Only active edges are selected; the failed steps the reference
+        engine would spend in between are added as a geometric random draw,
+        so the step count has the same distribution. With a weighted rule a
+        selected edge interacts with probability shared / F, as in the
+        reference engine, and a refused selection only adds its steps.
+
+        Args:
+            max_events: Return after this many selected edges (to report
+                progress); the run continues with the next call
+
+        Returns:
+            True once the run has ended (absorbed or max_steps reached)
+        """
+        F = self.num_features
+        overlap = self._overlap
+        edge_a = memoryview(self._edge_a)
+        edge_b = memoryview(self._edge_b)
+        weighted = self._weighted
+        recorder = self.recorder
+        rng = self.rng
+
+        for _ in range(max_events):
+            total_rate = self._total_rate
+            if self.active_edges == 0 or total_rate <= 0.0:
+                # Same confirmation window as the reference engine
+                self.step_count = min(self.step_count + self.num_agents, self.max_steps)
+                return True
+
+            # Steps until the next active edge is selected ~ Geometric(total_rate)
+            if total_rate >= 1.0:
+                wait = 1
+            else:
+                wait = 1 + int(math.log(1.0 - rng.uniform()) / math.log1p(-total_rate))
+
+            # The current state holds until the step before the next event
+            if self.step_count + wait > self._next_sample:
+                self._next_sample = recorder.record(self, min(self.step_count + wait - 1, self.max_steps))
+
+            if self.step_count + wait > self.max_steps:
+                self.step_count = self.max_steps
+                return True
+            self.step_count += wait
+
+            edge = self._sample_active_edge()
+            if weighted and rng.uniform() > overlap[edge] / F:
+                continue  # No interaction occurred
+
+            # Dominator choice inside _interact is symmetric, edge orientation is irrelevant
+            self._interact(edge_a[edge], edge_b[edge])
+
+        return False
+
+    def _advance_frontier_jit(self, max_events=NEVER):
+        """
+        Rejection-free events with the Numba-compiled loop of jit_kernel
+
+        Same dynamics as _advance_frontier, without event log. The loop
+        returns before every scheduled sample, which is recorded here, so
+        the recorder does not change the run. Call seed_kernel once first.
+
+        Args:
+            max_events: Return after about this many selected edges
+
+        Returns:
+            True once the run has ended (absorbed or max_steps reached)
+        """
+        while True:
+            # A sample past max_steps is never reached by an event
+            stop_step = self._next_sample if self._next_sample <= self.max_steps else NEVER
+            self.step_count, self.active_edges, self._wait, done = advance_frontier(
+                self.agents, self.topology.offsets, self.topology.neighbor_ids,
+                self.topology.neighbor_edges, self.edge_overlap, self.active_edges,
+                self._edge_a, self._edge_b, self._edge_geometry, self._geometry_rate,
+                self._class_start, self._class_count, self._frontier, self._edge_slot,
+                self.rule.ordered, self.rule.weighted, self.step_count, self._wait,
+                stop_step, self.max_steps, max_events
+            )
+            if done or self._wait == 0.0:
+                break  # Ended, or max_events reached
+
+            # Stopped at a sample: the state holds until the step before the pending event
+            self._sync_cultures()
+            self._next_sample = self.recorder.record(
+                self, min(self.step_count + int(self._wait) - 1, self.max_steps)
+            )
+
+        self._sum_class_rates()
+        return done
+
+    def _run_rejection_free(self):
+        """
+        Rejection-free (n-fold way) run, see _advance_frontier
+
+        Returns:
+            Number of steps taken to reach absorbing state
+        """
+        self._start_frontier()
+        self._advance_frontier()
+        self._finish_frontier()
+        return self.step_count
+
+    def _run_jit(self):
+        """
+        Reference engine run with the Numba-compiled loop of jit_kernel
+
+        The loop returns at every scheduled sample, which is recorded here
+        before the absorption check, as in _run_reference. Call seed_kernel
+        once first.
+
+        Returns:
+            Number of steps taken to reach absorbing state
+        """
+        recorder = self.recorder
+        next_sample = recorder.next_step if recorder is not None else NEVER
+        self.step_count = 0
+
+        while True:
+            self.step_count, self.active_edges, done = run_until_absorbed(
+                self.agents, self.topology.offsets, self.topology.neighbor_ids,
+                self.topology.neighbor_edges, self.edge_overlap, self.active_edges,
+                self.rule.ordered, self.rule.weighted, self.step_count, next_sample,
+                self.max_steps
+            )
+            if done or self.step_count >= self.max_steps:
+                break
+
+            self._sync_cultures()
+            next_sample = recorder.record(self, self.step_count)
+
+        self._sync_cultures()
+        return self.step_count
+
+    def _sync_cultures(self):
+        """Re-intern the culture table after a compiled loop, which does not report adoptions"""
+        if self.cultures is not None:
+            self.cultures = CultureTable(self.agents, self.num_states)
+
+    def _run_reference(self):
+        """
+        Reference run: one random (agent, neighbor) draw per step
+
+        Returns:
+            Number of steps taken to reach absorbing state
+        """
+        recorder = self.recorder
+        next_sample = recorder.next_step if recorder is not None else NEVER
+        self.step_count = 0
+
+        while self.step_count < self.max_steps:
+            if self.step_count >= next_sample:
+                next_sample = recorder.record(self, self.step_count)
+
+            if self.is_absorbing_state():
+                # The periodic check used to confirm absorption only after
+                # grid_size^2 consecutive failed interactions; keep counting
+                # those steps so steps_to_convergence keeps its meaning
+                self.step_count = min(
+                    self.step_count + self.num_agents,
+                    self.max_steps
+                )
+                break
+
+            self.step_count += 1
+
+            # Perform simulation step
+            self.simulation_step()
+
+        return self.step_count
+
+    def run(self):
+        """
+        Run the simulation until absorbing state or max steps reached
+
+        Returns:
+            Number of steps taken to reach absorbing state
+        """
+        # Recorder and event log see every run from start to finish
+        hooks = [hook for hook in (self.recorder, self.event_log) if hook is not None]
+        for hook in hooks:
+            hook.start(self)
+
+        if self.engine == 'rejection_free':
+            steps = self._run_rejection_free()
+        elif self.engine == 'jit' and NUMBA_AVAILABLE and self.event_log is None:
+            # One compiled stream per run, continued across the loop's returns
+            seed_kernel(int(self.rng.generator.integers(2**32)))
+            steps = self._run_jit()
+        else:
+            steps = self._run_reference()
+
+        for hook in hooks:
+            hook.finish(self)
+        return steps
+
+    def get_observables(self):
+        """
+        Current observables of the run, each read in O(1)
+
+        unique_cultures and largest_culture_share need track_cultures=True.
+
+        Returns:
+            Dictionary with step, unique_cultures, largest_culture_share and
+            active_bond_fraction (fraction of edges with 0 < overlap < F)
+        """
+        if self.cultures is None:
+            raise RuntimeError("Culture observables need the model to be created with track_cultures=True")
+
+        return {
+            'step': self.step_count,
+            'unique_cultures': self.cultures.num_cultures,
+            'largest_culture_share': self.cultures.largest_share(),
+            'active_bond_fraction': self.active_edges / max(len(self.edges), 1)
+        }
+
+    def get_grid(self):
+        """
+        Get the current grid state
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, num_features)
+        """
+        return self.grid.copy()
+
+    def get_culture_codes(self):
+        """
+        Get one packed culture code per agent
+
+        Two agents have the same code exactly when they share all features.
+        Requires num_states^num_features <= 2^64 (see culture.can_pack).
+
+        Returns:
+            uint64 numpy array of shape (grid_size * grid_size,)
+        """
+        return pack_cultures(self.agents, self.num_states)
@@ -0,0 +1,239 @@
+"""
+Compact change-event log of a run, with keyframes for replay
+
+An EventLog attached to the engine appends one packed record per successful
+adoption (step, agent, feature, new value) to a binary file, 16 bytes per
+event, and writes the full grid as a keyframe every keyframe_interval events.
+EventLogReader rebuilds the grid at any step from the nearest earlier
+keyframe plus the events after it, so long runs can be analysed or animated
+afterwards without storing every state.
+
+Files of a log with base path P:
+    P.events     raw EVENT_DTYPE records in step order
+    P.keyframes  raw grids, one (grid_size, grid_size, num_features) frame each
+    P.index.npz  keyframe steps and event offsets, grid shape and dtype
+"""
+import os
+from array import array
+
+import numpy as np
+
+# One record per adoption (packed, no padding)
+EVENT_DTYPE = np.dtype([('step', '<i8'), ('agent', '<u4'), ('feature', '<u2'), ('value', '<u2')])
+
+# Events buffered in memory before they are appended to the file
+FLUSH_EVENTS = 65536
+
+
+class EventLog:
+    """
+    Writer of the change-event log of one run
+
+    Keyframe 0 is the initial grid; keyframe k holds the grid after the
+    first k * keyframe_interval events.
+    """
+
+    def __init__(self, path, keyframe_interval=100000):
+        """
+        Args:
+            path: Base path of the log files (see module docstring)
+            keyframe_interval: Number of events between full-grid keyframes;
+                replay applies at most this many events
+        """
+        if keyframe_interval < 1:
+            raise ValueError(f"keyframe_interval must be at least 1, got {keyframe_interval}")
+
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.num_events = 0
+        self._grid = None
+
+    def start(self, model):
+        """
+        Open the log files for a new run and write the initial keyframe
+
+        Args:
+            model: AxelrodEngine about to run
+        """
+        if model.num_states > 2**16 or model.num_features > 2**16:
+            raise ValueError("Event records store features and states in 16 bits")
+
+        self._grid = model.grid
+        self._events_file = open(f"{self.path}.events", 'wb')
+        self._keyframes_file = open(f"{self.path}.keyframes", 'wb')
+
+        self._steps = array('q')
+        self._agents = array('L')
+        self._features = array('H')
+        self._values = array('H')
+
+        self.num_events = 0
+        self._until_keyframe = self.keyframe_interval
+        self._keyframe_steps = []
+        self._keyframe_events = []
+        self._keyframe(0)
+
+    def record(self, step, agent, feature, value):
+        """
+        Append one adoption: agent took value for feature at step
+
+        Args:
+            step: Step of the adoption (the model's step_count)
+            agent: Flat agent index
+            feature: Feature index
+            value: New trait value
+        """
+        self._steps.append(step)
+        self._agents.append(agent)
+        self._features.append(feature)
+        self._values.append(value)
+        self.num_events += 1
+
+        self._until_keyframe -= 1
+        if self._until_keyframe == 0:
+            self._until_keyframe = self.keyframe_interval
+            self._keyframe(step)
+        elif len(self._steps) >= FLUSH_EVENTS:
+            self._flush()
+
+    def _keyframe(self, step):
+        """Write the current grid as the keyframe for step"""
+        self._flush()
+        self._grid.tofile(self._keyframes_file)
+        self._keyframe_steps.append(step)
+        self._keyframe_events.append(self.num_events)
+
+    def _flush(self):
+        """Append the buffered events to the events file"""
+        if not self._steps:
+            return
+
+        events = np.empty(len(self._steps), dtype=EVENT_DTYPE)
+        events['step'] = self._steps
+        events['agent'] = self._agents
+        events['feature'] = self._features
+        events['value'] = self._values
+        events.tofile(self._events_file)
+
+        del self._steps[:], self._agents[:], self._features[:], self._values[:]
+
+    def finish(self, model):
+        """
+        Flush the events, close the files and write the index
+
+        Args:
+            model: AxelrodEngine that finished run()
+        """
+        self._flush()
+        self._events_file.close()
+        self._keyframes_file.close()
+
+        np.savez(
+            f"{self.path}.index.npz",
+            keyframe_steps=np.array(self._keyframe_steps, dtype=np.int64),
+            keyframe_events=np.array(self._keyframe_events, dtype=np.int64),
+            grid_shape=np.array(model.grid.shape, dtype=np.int64),
+            grid_dtype=np.array(model.grid.dtype.str),
+            final_step=np.int64(model.step_count)
+        )
+        self._grid = None
+
+
+class DiscardedEventLog:
+    """
+    Event log that writes nothing
+
+    Attaching it gives a run the code path of a logged run: with the 'jit'
+    and 'frontier' engines an event log selects the Python loop, whose
+    random stream differs from the compiled one. Replays of a logged sweep
+    use it to re-execute the same run without overwriting the log.
+    """
+
+    def start(self, model):
+        """Nothing to open"""
+
+    def record(self, step, agent, feature, value):
+        """Discard one adoption"""
+
+    def finish(self, model):
+        """Nothing to close"""
+
+
+class EventLogReader:
+    """
+    Replay of a change-event log
+
+    Attributes:
+        events: Read-only memmap of all EVENT_DTYPE records
+        final_step: step_count of the model when the run ended
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Base path the EventLog was written to
+        """
+        with np.load(f"{path}.index.npz") as index:
+            self.keyframe_steps = index['keyframe_steps']
+            self.keyframe_events = index['keyframe_events']
+            self.grid_shape = tuple(int(n) for n in index['grid_shape'])
+            self.grid_dtype = np.dtype(str(index['grid_dtype']))
+            self.final_step = int(index['final_step'])
+
+        # np.memmap cannot map an empty file (run without adoptions)
+        if os.path.getsize(f"{path}.events") > 0:
+            self.events = np.memmap(f"{path}.events", dtype=EVENT_DTYPE, mode='r')
+        else:
+            self.events = np.zeros(0, dtype=EVENT_DTYPE)
+
+        self.keyframes = np.memmap(
+            f"{path}.keyframes", dtype=self.grid_dtype, mode='r',
+            shape=(len(self.keyframe_steps),) + self.grid_shape
+        )
+
+    @property
+    def num_events(self):
+        """Number of logged adoptions"""
+        return len(self.events)
+
+    def state_at(self, step):
+        """
+        Grid after the given number of steps
+
+        Args:
+            step: Step count (0 = initial grid); steps past the end of the
+                run give the final grid
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, num_features)
+        """
+        # Last keyframe at or before step, then the events after it up to step
+        k = max(int(np.searchsorted(self.keyframe_steps, step, side='right')) - 1, 0)
+        first = int(self.keyframe_events[k])
+        last = first + int(np.searchsorted(self.events['step'][first:], step, side='right'))
+
+        grid = np.array(self.keyframes[k])
+        agents = grid.reshape(-1, self.grid_shape[-1])
+        events = self.events[first:last]
+        if len(events) > 0:
+            # Only the last change of each (agent, feature) matters
+            cells = events['agent'].astype(np.int64) * self.grid_shape[-1] + events['feature']
+            _, reverse_first = np.unique(cells[::-1], return_index=True)
+            latest = len(cells) - 1 - reverse_first
+            agents[events['agent'][latest], events['feature'][latest]] = events['value'][latest]
+
+        return grid
+
+    def states(self, steps):
+        """
+        Grids at several steps
+
+        Args:
+            steps: Iterable of step counts
+
+        Returns:
+            Generator of grids, one per step
+        """
+        for step in steps:
+            yield self.state_at(step)
+
@@ -0,0 +1,59 @@
+"""
+Compiled feature schema for interpretable Axelrod models
+
+Feature configurations are lists of dictionaries such as
+    {'name': 'Politics', 'hasOrder': True, 'states': ['Left', ..., 'Right']}
+which are convenient to write but slow to query in the step loop. A
+FeatureSchema turns them once into flat arrays that the step loop, the
+initializers and the compiled/vectorized engines read directly.
+"""
+import numpy as np
+
+
+class FeatureSchema:
+    """
+    Per-feature arrays derived from a list of feature configurations
+
+    Attributes:
+        num_features: Number of features
+        has_order: (num_features,) bool array, True for ordered (spectrum)
+            features that move one state per interaction
+        num_states: (num_features,) int array, number of states per feature
+        max_states: Largest number of states of any feature
+        spectrum_features: int array of ordered feature indices
+        nominal_features: int array of unordered feature indices
+        names: Feature names (None where a config has no name)
+    """
+
+    def __init__(self, feature_configs):
+        """
+        Compile a list of feature configurations
+
+        Args:
+            feature_configs: List of feature dictionaries with at least
+                'states' (list of state labels) and 'hasOrder' (bool)
+
+        Raises:
+            ValueError: If there are no features or a feature has no states
+        """
+        if len(feature_configs) == 0:
+            raise ValueError("At least one feature is required")
+
+        self.num_features = len(feature_configs)
+        self.names = [config.get('name') for config in feature_configs]
+        self.has_order = np.array([bool(config['hasOrder']) for config in feature_configs], dtype=bool)
+        self.num_states = np.array([len(config['states']) for config in feature_configs], dtype=np.int64)
+        if (self.num_states < 1).any():
+            raise ValueError("Every feature needs at least one state")
+
+        self.max_states = int(self.num_states.max())
+        self.spectrum_features = np.flatnonzero(self.has_order)
+        self.nominal_features = np.flatnonzero(~self.has_order)
+
+        # Schemas are shared between models, keep the arrays read-only
+        for array in (self.has_order, self.num_states, self.spectrum_features, self.nominal_features):
+            array.flags.writeable = False
+
+    def __repr__(self):
+        return (f"FeatureSchema(features={self.num_features}, "
+                f"ordered={len(self.spectrum_features)}, max_states={self.max_states})")
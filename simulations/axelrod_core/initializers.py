@@ -0,0 +1,308 @@
+"""
+Grid initializers for the Axelrod engine
+
+An initializer draws the starting traits of every agent from the model's
+numpy Generator. All initializers return an array of shape
+(grid_size, grid_size, num_features) in the requested dtype.
+"""
+from functools import lru_cache
+from statistics import NormalDist
+
+import numpy as np
+
+
+def _state_r(num_states):
+    """
+    r value (0 to 1) of every state index of a feature, used for correlation
+
+    Returns:
+        float array of shape (num_states,)
+    """
+    if num_states == 1:
+        return np.zeros(1)
+    return np.arange(num_states) / (num_states - 1)
+
+
+@lru_cache(maxsize=None)
+def correlated_state_cdf(anchor_states, num_states, correlation):
+    """
+    Cumulative state probabilities of a spectrum feature given the anchor state
+
+    Uses the correlation formula from App.jsx (line 100):
+    P = (1 - distance) * (1 + correlation) + distance * (1 - correlation),
+    with distance = |r_anchor - r_state|, normalized per anchor state.
+    Computed once per configuration and shared by all runs of a worker.
+
+    Args:
+        anchor_states: Number of states of the anchor feature
+        num_states: Number of states of the correlated feature
+        correlation: Correlation between spectrum features (-1 to 1)
+
+    Returns:
+        Read-only array of shape (anchor_states, num_states); row a is the
+        CDF over the feature's states given anchor state a
+    """
+    distance = np.abs(_state_r(anchor_states)[:, None] - _state_r(num_states)[None, :])
+    probabilities = (1 - distance) * (1 + correlation) + distance * (1 - correlation)
+
+    # Normalize probabilities, fall back to uniform if they sum to zero
+    sums = probabilities.sum(axis=1, keepdims=True)
+    probabilities = np.divide(probabilities, sums, out=np.full_like(probabilities, 1 / num_states),
+                              where=sums > 0)
+
+    cdf = np.cumsum(probabilities, axis=1)
+    cdf[:, -1] = 1.0  # No round-off gap at the top
+    cdf.flags.writeable = False
+    return cdf
+
+
+class UniformInitializer:
+    """
+    Every trait uniform over the states of its feature
+    """
+
+    def __init__(self, num_states):
+        """
+        Args:
+            num_states: Number of states, one int for all features or a
+                sequence with one entry per feature
+        """
+        self.num_states = num_states
+
+    def initialize(self, generator, grid_size, num_features, dtype):
+        """
+        Draw a random grid
+
+        Args:
+            generator: numpy Generator to draw from
+            grid_size: Size of the square grid
+            num_features: Number of features per agent
+            dtype: dtype of the returned grid
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, num_features)
+        """
+        return generator.integers(0, self.num_states, size=(grid_size, grid_size, num_features),
+                                  dtype=dtype)
+
+
+class CorrelatedInitializer:
+    """
+    Nominal features uniform, spectrum (ordered) features correlated
+
+    Implements the randomization logic from App.jsx (lines 48-131): every node
+    picks a random anchor spectrum feature and state, and samples its other
+    spectrum features from the correlated distribution given the anchor.
+    """
+
+    def __init__(self, num_states, has_order, correlation):
+        """
+        Args:
+            num_states: Sequence with the number of states of every feature
+            has_order: Sequence of bools, True for spectrum features
+            correlation: Correlation coefficient between all spectrum
+                feature pairs (-1 to 1)
+        """
+        self.num_states = [int(n) for n in num_states]
+        has_order = [bool(flag) for flag in has_order]
+        if len(has_order) != len(self.num_states):
+            raise ValueError("num_states and has_order need one entry per feature")
+
+        self.spectrum_features = [f for f, flag in enumerate(has_order) if flag]
+        self.nominal_features = [f for f, flag in enumerate(has_order) if not flag]
+        self.correlation = correlation
+
+    def initialize(self, generator, grid_size, num_features, dtype):
+        """
+        Draw a correlated random grid, vectorized over all nodes
+
+        Args:
+            generator: numpy Generator to draw from
+            grid_size: Size of the square grid
+            num_features: Number of features per agent
+            dtype: dtype of the returned grid
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, num_features)
+        """
+        if num_features != len(self.num_states):
+            raise ValueError(f"Initializer has {len(self.num_states)} features, expected {num_features}")
+
+        num_states = self.num_states
+        spectrum_features = self.spectrum_features
+        num_nodes = grid_size * grid_size
+
+        grid = np.zeros((num_nodes, num_features), dtype=dtype)
+
+        # Step 1: Randomly choose non-spectrum features
+        for idx in self.nominal_features:
+            grid[:, idx] = generator.integers(0, num_states[idx], size=num_nodes)
+
+        if len(spectrum_features) > 0:
+            # Step 2: Randomly select anchor spectrum feature and its state
+            anchor_in_list = generator.integers(0, len(spectrum_features), size=num_nodes)
+
+            for list_idx, anchor_idx in enumerate(spectrum_features):
+                nodes = np.flatnonzero(anchor_in_list == list_idx)
+                anchor_states = generator.integers(0, num_states[anchor_idx], size=len(nodes))
+                grid[nodes, anchor_idx] = anchor_states
+
+                # Step 3: Sample the other spectrum features from their
+                # correlated distribution given the anchor (inverse CDF)
+                for feature_idx in spectrum_features:
+                    if feature_idx == anchor_idx:
+                        continue  # Skip anchor
+
+                    cdf = correlated_state_cdf(
+                        num_states[anchor_idx], num_states[feature_idx], self.correlation
+                    )[anchor_states]
+                    rand = generator.random(len(nodes))
+                    # First state with rand <= cumulative probability
+                    grid[nodes, feature_idx] = np.count_nonzero(cdf < rand[:, None], axis=1)
+
+        return grid.reshape(grid_size, grid_size, num_features)
+
+
+def nearest_correlation_matrix(matrix):
+    """
+    Closest valid correlation matrix (symmetric, positive semi-definite,
+    unit diagonal)
+
+    Negative eigenvalues are clipped to zero and the result is rescaled to
+    unit diagonal. Valid matrices are returned unchanged; invalid ones such
+    as pairwise correlation -1 between three features are mapped to the
+    strongest dependence that is actually attainable.
+
+    Args:
+        matrix: Square array-like of pairwise correlations
+
+    Returns:
+        float array of the same shape
+    """
+    matrix = np.array(matrix, dtype=float)
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"Correlation matrix must be square, got shape {matrix.shape}")
+
+    matrix = (matrix + matrix.T) / 2
+    np.fill_diagonal(matrix, 1.0)
+
+    eigenvalues, eigenvectors = np.linalg.eigh(matrix)
+    if eigenvalues.min() >= 0:
+        return matrix
+
+    matrix = (eigenvectors * np.clip(eigenvalues, 0, None)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(matrix))
+    matrix = matrix / np.outer(scale, scale)
+    np.fill_diagonal(matrix, 1.0)
+    return matrix
+
+
+@lru_cache(maxsize=None)
+def _normal_thresholds(num_states):
+    """
+    Standard normal quantiles splitting the line into num_states equally
+    likely bins
+
+    Returns:
+        float array of shape (num_states - 1,)
+    """
+    normal = NormalDist()
+    thresholds = np.array([normal.inv_cdf(k / num_states) for k in range(1, num_states)])
+    thresholds.flags.writeable = False
+    return thresholds
+
+
+class CopulaInitializer:
+    """
+    Spectrum features from a Gaussian copula, nominal features uniform
+
+    All agents' spectrum features are drawn at once: one correlated standard
+    normal vector per agent (a single matrix product with a square-root factor
+    of the correlation matrix), discretized per feature into equally likely
+    states. Each feature therefore stays uniform over its states, while the
+    matrix sets the dependence between every pair of spectrum features.
+    """
+
+    def __init__(self, num_states, has_order, correlation_matrix):
+        """
+        Args:
+            num_states: Sequence with the number of states of every feature
+            has_order: Sequence of bools, True for spectrum features
+            correlation_matrix: (num_features, num_features) array-like of
+                pairwise correlations; only the entries between spectrum
+                features are used, invalid matrices are replaced by the
+                nearest valid one (see nearest_correlation_matrix)
+        """
+        self.num_states = [int(n) for n in num_states]
+        has_order = [bool(flag) for flag in has_order]
+        if len(has_order) != len(self.num_states):
+            raise ValueError("num_states and has_order need one entry per feature")
+
+        matrix = np.asarray(correlation_matrix, dtype=float)
+        if matrix.shape != (len(self.num_states), len(self.num_states)):
+            raise ValueError(f"Correlation matrix has shape {matrix.shape}, "
+                             f"expected {(len(self.num_states), len(self.num_states))}")
+
+        self.spectrum_features = [f for f, flag in enumerate(has_order) if flag]
+        self.nominal_features = [f for f, flag in enumerate(has_order) if not flag]
+        self.correlation_matrix = nearest_correlation_matrix(
+            matrix[np.ix_(self.spectrum_features, self.spectrum_features)]
+        )
+
+        # Factor with L @ L.T = correlation matrix; eigen decomposition also
+        # handles singular matrices (e.g. correlation exactly +-1)
+        eigenvalues, eigenvectors = np.linalg.eigh(self.correlation_matrix)
+        self._factor = eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+    def initialize(self, generator, grid_size, num_features, dtype):
+        """
+        Draw a copula-correlated random grid
+
+        Args:
+            generator: numpy Generator to draw from
+            grid_size: Size of the square grid
+            num_features: Number of features per agent
+            dtype: dtype of the returned grid
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, num_features)
+        """
+        if num_features != len(self.num_states):
+            raise ValueError(f"Initializer has {len(self.num_states)} features, expected {num_features}")
+
+        num_nodes = grid_size * grid_size
+        grid = np.zeros((num_nodes, num_features), dtype=dtype)
+
+        for idx in self.nominal_features:
+            grid[:, idx] = generator.integers(0, self.num_states[idx], size=num_nodes)
+
+        if len(self.spectrum_features) > 0:
+            # Correlated standard normals for all nodes in one matrix product
+            latent = generator.standard_normal((num_nodes, len(self.spectrum_features))) @ self._factor.T
+
+            for column, idx in enumerate(self.spectrum_features):
+                grid[:, idx] = np.searchsorted(_normal_thresholds(self.num_states[idx]), latent[:, column])
+
+        return grid.reshape(grid_size, grid_size, num_features)
+
+
+class GridInitializer:
+    """
+    Start from a given grid instead of a random one
+    """
+
+    def __init__(self, grid):
+        """
+        Args:
+            grid: Array with grid_size * grid_size * num_features traits
+        """
+        self.grid = grid
+
+    def initialize(self, generator, grid_size, num_features, dtype):
+        """
+        Copy the given grid (the generator is not used)
+
+        Returns:
+            numpy array of shape (grid_size, grid_size, num_features)
+        """
+        return np.array(self.grid, dtype=dtype, copy=True).reshape(grid_size, grid_size, num_features)
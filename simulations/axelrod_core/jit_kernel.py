@@ -0,0 +1,283 @@
+"""
+Optional Numba-compiled run loops for the Axelrod models
+
+The whole run-until-absorbed loop of the reference engine, and the event loop
+of the rejection-free engine, are each compiled into one function when Numba
+is installed. They work directly on a model's flat agent array, CSR neighbor
+tables, edge-overlap cache and (rejection-free) active-edge frontier, and
+follow exactly the step rule of the Python engines, so steps_to_convergence
+has the same distribution. Without Numba, NUMBA_AVAILABLE is False and the
+models run their pure-Python loops instead.
+"""
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+NUMBA_AVAILABLE = numba is not None
+
+
+def _njit(function):
+    """Compile with Numba when available, otherwise leave the function as is"""
+    if numba is None:
+        return function
+    return numba.njit(cache=True, nogil=True)(function)
+
+
+@_njit
+def seed_kernel(seed):
+    """
+    Seed the random number generator of the compiled loops
+
+    Numba keeps one generator per thread for all compiled functions, so a
+    run seeds it once and its loops continue the stream from call to call.
+
+    Args:
+        seed: Seed, e.g. drawn from the model's own generator
+    """
+    np.random.seed(seed)
+
+
+@_njit
+def _adopt(agents, ordered, agent, neighbor, shared):
+    """
+    Interaction of an active pair: one random differing feature of a random
+    receiver moves toward the dominator, by copying it or, for ordered
+    features, by one state
+
+    Args:
+        agents: (num_agents, F) trait array, updated in place
+        ordered: (F,) bool array, True for features with one-step transitions
+        agent, neighbor: The two agents
+        shared: Number of features they share
+
+    Returns:
+        Tuple (receiver, feature, old_value, new_value)
+    """
+    F = agents.shape[1]
+
+    # Select random differing feature: the pick-th one in feature order
+    pick = np.random.randint(0, F - shared)
+    feature = 0
+    for f in range(F):
+        if agents[agent, f] != agents[neighbor, f]:
+            if pick == 0:
+                feature = f
+                break
+            pick -= 1
+
+    # Randomly select dominator (50/50 chance)
+    if np.random.random() < 0.5:
+        receiver, dominator = agent, neighbor
+    else:
+        receiver, dominator = neighbor, agent
+
+    old_value = np.int64(agents[receiver, feature])
+    dominator_value = np.int64(agents[dominator, feature])
+    if not ordered[feature]:
+        new_value = dominator_value
+    elif dominator_value > old_value:
+        new_value = old_value + 1
+    else:
+        new_value = old_value - 1
+    agents[receiver, feature] = new_value
+
+    return receiver, feature, old_value, new_value
+
+
+@_njit
+def _move_frontier_edge(edge, is_active, edge_geometry, class_start, class_count, frontier, edge_slot):
+    """Add an edge that became active to its class segment, or remove one that became inactive"""
+    geometry = edge_geometry[edge]
+    end = class_start[geometry] + class_count[geometry]
+    if is_active:
+        frontier[end] = edge
+        edge_slot[edge] = end
+        class_count[geometry] += 1
+    else:
+        # Swap-with-last removal
+        last = frontier[end - 1]
+        frontier[edge_slot[edge]] = last
+        edge_slot[last] = edge_slot[edge]
+        edge_slot[edge] = -1
+        class_count[geometry] -= 1
+
+
+@_njit
+def run_until_absorbed(agents, offsets, neighbor_ids, neighbor_edges, edge_overlap, active_edges,
+                       ordered, weighted, step_count, stop_step, max_steps):
+    """
+    Reference engine run loop
+
+    Every step draws a random agent and a random neighbor. A pair sharing some
+    but not all features interacts (with probability shared / F if weighted),
+    see _adopt. Draws from the stream set up by seed_kernel.
+
+    Args:
+        agents: (num_agents, F) trait array, updated in place
+        offsets, neighbor_ids, neighbor_edges: CSR tables of the topology
+        edge_overlap: (num_edges,) shared feature counts, updated in place
+        active_edges: Number of edges with 0 < overlap < F
+        ordered: (F,) bool array, True for features with one-step transitions
+        weighted: Interact with probability shared / F instead of always
+        step_count: Steps taken so far
+        stop_step: Return once step_count reaches this step (e.g. the next
+            time-series sample), before the absorption check at that step
+        max_steps: Maximum number of simulation steps
+
+    Returns:
+        Tuple (step_count, active_edges, done), done once absorbed
+    """
+    num_agents, F = agents.shape
+
+    while step_count < min(stop_step, max_steps):
+        if active_edges == 0:
+            # Same absorption confirmation window as the Python engines
+            return min(step_count + num_agents, max_steps), active_edges, True
+
+        step_count += 1
+
+        # Select random agent and random neighbor
+        agent = np.random.randint(0, num_agents)
+        start = offsets[agent]
+        k = start + np.random.randint(0, offsets[agent + 1] - start)
+        neighbor = neighbor_ids[k]
+
+        shared = edge_overlap[neighbor_edges[k]]
+        if shared == 0 or shared == F:
+            continue  # Failed interaction
+        if weighted and np.random.random() > shared / F:
+            continue  # No interaction occurred
+
+        receiver, feature, old_value, new_value = _adopt(agents, ordered, agent, neighbor, shared)
+
+        # Update overlaps of the edges touching the receiver
+        for j in range(offsets[receiver], offsets[receiver + 1]):
+            neighbor_value = np.int64(agents[neighbor_ids[j], feature])
+            delta = np.int64(neighbor_value == new_value) - np.int64(neighbor_value == old_value)
+            if delta == 0:
+                continue
+
+            edge = neighbor_edges[j]
+            before = edge_overlap[edge]
+            after = before + delta
+            edge_overlap[edge] = after
+
+            was_active = 0 < before < F
+            is_active = 0 < after < F
+            if was_active and not is_active:
+                active_edges -= 1
+            elif is_active and not was_active:
+                active_edges += 1
+
+    return step_count, active_edges, False
+
+
+@_njit
+def advance_frontier(agents, offsets, neighbor_ids, neighbor_edges, edge_overlap, active_edges,
+                     edge_a, edge_b, edge_geometry, geometry_rate, class_start, class_count,
+                     frontier, edge_slot, ordered, weighted, step_count, wait, stop_step, max_steps,
+                     max_events):
+    """
+    Rejection-free engine event loop (see AxelrodEngine._advance_frontier)
+
+    Every event selects an active edge with probability proportional to the
+    rate of its geometry class and adds the failed steps the reference
+    engine would spend before it as a geometric draw. The selected pair
+    interacts (with probability shared / F if weighted), see _adopt. Draws
+    from the stream set up by seed_kernel.
+
+    Args:
+        agents: (num_agents, F) trait array, updated in place
+        offsets, neighbor_ids, neighbor_edges: CSR tables of the topology
+        edge_overlap: (num_edges,) shared feature counts, updated in place
+        active_edges: Number of edges with 0 < overlap < F
+        edge_a, edge_b: (num_edges,) endpoints of every edge
+        edge_geometry: (num_edges,) geometry class of every edge
+        geometry_rate: (num_classes,) selection rate of one edge per class
+        class_start, class_count: (num_classes,) segment start and number
+            of active edges of every class in frontier, counts updated in place
+        frontier: (num_edges,) edge ids, active ones first in each class
+            segment, updated in place
+        edge_slot: (num_edges,) position of every active edge in frontier
+            (-1 for inactive edges), updated in place
+        ordered: (F,) bool array, True for features with one-step transitions
+        weighted: Interact with probability shared / F instead of always
+        step_count: Steps taken so far
+        wait: Steps to the next event drawn before the last return (0 = none)
+        stop_step: Return before an event that would take step_count past
+            this step (e.g. the next time-series sample), with its wait
+        max_steps: Maximum number of simulation steps
+        max_events: Return after this many selected edges
+
+    Returns:
+        Tuple (step_count, active_edges, wait, done), done once the run has ended
+    """
+    num_agents, F = agents.shape
+    num_classes = len(geometry_rate)
+
+    for _ in range(max_events):
+        total_rate = 0.0
+        for geometry in range(num_classes):
+            total_rate += class_count[geometry] * geometry_rate[geometry]
+
+        if active_edges == 0 or total_rate <= 0.0:
+            # Same absorption confirmation window as the reference engine
+            return min(step_count + num_agents, max_steps), active_edges, 0.0, True
+
+        # Steps until the next active edge is selected ~ Geometric(total_rate)
+        if wait == 0.0:
+            if total_rate >= 1.0:
+                wait = 1.0
+            else:
+                wait = 1.0 + np.floor(np.log(1.0 - np.random.random()) / np.log1p(-total_rate))
+
+        # The caller samples the current state, which holds until the event
+        if step_count + wait > stop_step:
+            return step_count, active_edges, wait, False
+        if step_count + wait > max_steps:
+            return max_steps, active_edges, 0.0, True
+        step_count += np.int64(wait)
+        wait = 0.0
+
+        # Cumulative scan over the class rates, then uniform within the class
+        target = np.random.random() * total_rate
+        geometry = num_classes - 1
+        for candidate in range(num_classes):
+            class_rate = class_count[candidate] * geometry_rate[candidate]
+            if class_count[candidate] > 0:
+                geometry = candidate
+                if target < class_rate:
+                    break
+            target -= class_rate
+        index = min(np.int64(target / geometry_rate[geometry]), class_count[geometry] - 1)
+        edge = frontier[class_start[geometry] + max(index, 0)]
+
+        shared = edge_overlap[edge]
+        if weighted and np.random.random() > shared / F:
+            continue  # No interaction occurred
+
+        receiver, feature, old_value, new_value = _adopt(agents, ordered, edge_a[edge], edge_b[edge], shared)
+
+        # Update overlaps and the frontier for the edges touching the receiver
+        for j in range(offsets[receiver], offsets[receiver + 1]):
+            neighbor_value = np.int64(agents[neighbor_ids[j], feature])
+            delta = np.int64(neighbor_value == new_value) - np.int64(neighbor_value == old_value)
+            if delta == 0:
+                continue
+
+            incident = neighbor_edges[j]
+            before = np.int64(edge_overlap[incident])
+            after = before + delta
+            edge_overlap[incident] = after
+
+            was_active = 0 < before < F
+            is_active = 0 < after < F
+            if was_active != is_active:
+                _move_frontier_edge(incident, is_active, edge_geometry, class_start, class_count,
+                                    frontier, edge_slot)
+                active_edges += 1 if is_active else -1
+
+    return step_count, active_edges, wait, False
@@ -0,0 +1,499 @@
+"""
+Metrics calculation for Axelrod model simulations
+"""
+import numpy as np
+from .culture import can_pack, pack_cultures
+
+
+def culture_keys(agents):
+    """
+    One integer key per agent, equal exactly for identical cultures
+
+    Args:
+        agents: numpy array of shape (N, F)
+
+    Returns:
+        Packed base-q culture codes when they fit in 64 bits, otherwise
+        indices into the distinct cultures (slower, row-wise unique)
+    """
+    F = agents.shape[1]
+    q = int(agents.max()) + 1 if agents.size else 1
+    if can_pack(F, q):
+        return pack_cultures(agents, q)
+
+    # View every row as one opaque byte string so np.unique compares whole
+    # cultures in a single 1-D sort instead of a lexicographic row sort
+    rows = np.ascontiguousarray(agents)
+    row_view = rows.view(np.dtype((np.void, rows.dtype.itemsize * F))).reshape(-1)
+    return np.unique(row_view, return_inverse=True)[1].reshape(-1)
+
+
+def get_unique_cultures(grid):
+    """
+    Count the number of unique cultural profiles in the grid
+
+    Args:
+        grid: numpy array of shape (grid_size, grid_size, F)
+
+    Returns:
+        Number of unique cultures
+    """
+    # Reshape grid to (N, F) where N = grid_size^2
+    grid_size = grid.shape[0]
+    F = grid.shape[2]
+    reshaped = grid.reshape(grid_size * grid_size, F)
+
+    # Identical cultures share one key, so count distinct keys
+    return len(np.unique(culture_keys(reshaped)))
+
+
+def _grid_keys(grids):
+    """
+    Culture keys of a stack of grids
+
+    Args:
+        grids: numpy array of shape (R, grid_size, grid_size, F)
+
+    Returns:
+        Key array of shape (R, grid_size, grid_size), comparable within and
+        across grids of the stack
+    """
+    F = grids.shape[-1]
+    return culture_keys(grids.reshape(-1, F)).reshape(grids.shape[:-1])
+
+
+def _same_culture_edges(keys, topology=None):
+    """
+    Neighboring pairs whose agents share all features
+
+    Args:
+        keys: Culture keys of shape (R, grid_size, grid_size)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        Tuple (a, b) of int arrays with the indices of each pair into the
+        flattened stack (replica r, agent i -> r * grid_size^2 + i)
+    """
+    num_replicas, grid_size = keys.shape[:2]
+    num_agents = grid_size * grid_size
+
+    if topology is None:
+        # Open lattice: right and lower neighbors through shifted slices
+        index = np.arange(num_replicas * num_agents).reshape(keys.shape)
+        horizontal = keys[:, :, 1:] == keys[:, :, :-1]
+        vertical = keys[:, 1:] == keys[:, :-1]
+        a = np.concatenate([index[:, :, :-1][horizontal], index[:, :-1][vertical]])
+        b = np.concatenate([index[:, :, 1:][horizontal], index[:, 1:][vertical]])
+        return a, b
+
+    keys = keys.reshape(num_replicas, num_agents)
+    edges = topology.edges
+    replica, edge = np.nonzero(keys[:, edges[:, 0]] == keys[:, edges[:, 1]])
+    offset = replica * num_agents
+    return edges[edge, 0] + offset, edges[edge, 1] + offset
+
+
+def _union_find(num_nodes, a, b):
+    """
+    Connected components of the graph with edges (a[k], b[k])
+
+    Vectorized union-find: every round hooks the larger root of each
+    still-separate pair onto the smaller one, then compresses all paths by
+    pointer jumping. The number of rounds grows with the logarithm of the
+    component size, not with the number of nodes.
+
+    Returns:
+        int array of shape (num_nodes,); the label of every node is the
+        smallest node index of its component
+    """
+    labels = np.arange(num_nodes)
+
+    while len(a):
+        root_a = labels[a]
+        root_b = labels[b]
+        separate = root_a != root_b
+        if not separate.any():
+            break
+        a, b = a[separate], b[separate]
+        root_a, root_b = root_a[separate], root_b[separate]
+
+        # Hook: every root points to the smallest root it is joined with
+        np.minimum.at(labels, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+
+        # Compress: follow parents until every node points at its root
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+            labels = parents
+
+    return labels
+
+
+def label_domains(grid, topology=None):
+    """
+    Label the cultural domains (connected regions of identical agents)
+
+    Args:
+        grid: numpy array of shape (grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        int array of shape (grid_size * grid_size,); agents in the same
+        domain share a label, the smallest flat agent index of the domain
+    """
+    grid_size = grid.shape[0]
+    a, b = _same_culture_edges(_grid_keys(grid[None]), topology)
+    return _union_find(grid_size * grid_size, a, b)
+
+
+def get_domain_sizes(grid, topology=None):
+    """
+    Size of every cultural domain (connected region of identical agents)
+
+    Args:
+        grid: numpy array of shape (grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        int array of domain sizes, largest first
+    """
+    sizes = np.bincount(label_domains(grid, topology))
+    return np.sort(sizes[sizes > 0])[::-1]
+
+
+def get_largest_domain(grid, topology=None):
+    """
+    Find the size of the largest cultural domain (connected region of identical agents)
+
+    Args:
+        grid: numpy array of shape (grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        Tuple (largest_domain_size, largest_domain_percentage)
+    """
+    return _largest_domain(get_domain_sizes(grid, topology), grid.shape[0] * grid.shape[1])
+
+
+def _largest_domain(domain_sizes, total_nodes):
+    """Largest domain size and its percentage of all nodes"""
+    largest_domain_size = int(domain_sizes[0]) if len(domain_sizes) else 0
+    largest_domain_percentage = (largest_domain_size / total_nodes) * 100
+    return largest_domain_size, largest_domain_percentage
+
+
+def get_average_cultural_distance(grid, topology=None):
+    """
+    Calculate average cultural distance between all neighboring pairs
+
+    Args:
+        grid: numpy array of shape (grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        Average cultural distance (0 to 1)
+    """
+    differing, num_edges = _differing_features(grid[None], topology)
+    return float(_average_distance(differing, num_edges, grid.shape[2])[0])
+
+
+def _domain_counts(keys, topology=None):
+    """
+    Domain sizes of every replica as one dense array
+
+    Args:
+        keys: Culture keys of shape (R, grid_size, grid_size)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        int array of shape (R, grid_size^2); entry (r, i) is the size of
+        the domain labeled i in replica r, 0 where i is not a label
+    """
+    num_replicas, grid_size = keys.shape[:2]
+    num_agents = grid_size * grid_size
+    a, b = _same_culture_edges(keys, topology)
+    labels = _union_find(num_replicas * num_agents, a, b)
+
+    # Labels never cross replicas, so one bincount splits into per-replica rows
+    return np.bincount(labels, minlength=num_replicas * num_agents).reshape(num_replicas, num_agents)
+
+
+def _count_unique(keys):
+    """Number of distinct keys per replica of a (R, ...) key array"""
+    keys = np.sort(keys.reshape(keys.shape[0], -1), axis=1)
+    return 1 + np.count_nonzero(keys[:, 1:] != keys[:, :-1], axis=1)
+
+
+def _differing_features(grids, topology=None):
+    """
+    Total number of differing features over all neighboring pairs
+
+    Args:
+        grids: numpy array of shape (R, grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        Tuple (differing, num_edges) with differing an int array of shape (R,)
+    """
+    num_replicas, grid_size = grids.shape[:2]
+    F = grids.shape[3]
+
+    if topology is None:
+        # Open lattice: compare every cell with its right and lower neighbor
+        # through shifted slices, no edge list needed
+        num_edges = 2 * grid_size * (grid_size - 1)
+        differing = (np.count_nonzero(grids[:, :, 1:] != grids[:, :, :-1], axis=(1, 2, 3))
+                     + np.count_nonzero(grids[:, 1:] != grids[:, :-1], axis=(1, 2, 3)))
+    else:
+        num_edges = topology.num_edges
+        agents = grids.reshape(num_replicas, grid_size * grid_size, F)
+        edges = topology.edges
+        differing = np.count_nonzero(agents[:, edges[:, 0]] != agents[:, edges[:, 1]], axis=(1, 2))
+
+    return differing, num_edges
+
+
+def _average_distance(differing, num_edges, F):
+    """
+    Mean fraction of differing features per neighboring pair
+
+    Summing the integer counts first leaves a single rounding step.
+
+    Returns:
+        float array of the shape of differing (0 without any pairs)
+    """
+    if num_edges == 0:
+        return np.zeros(len(differing))
+    return differing / (F * num_edges)
+
+
+def get_batch_unique_cultures(grids):
+    """
+    Count the unique cultural profiles of every grid in a stack
+
+    Args:
+        grids: numpy array of shape (R, grid_size, grid_size, F)
+
+    Returns:
+        int array of shape (R,)
+    """
+    return _count_unique(_grid_keys(grids))
+
+
+def get_batch_domain_sizes(grids, topology=None):
+    """
+    Size of every cultural domain of every grid in a stack
+
+    Args:
+        grids: numpy array of shape (R, grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        List of R int arrays of domain sizes, largest first
+    """
+    return [np.sort(counts[counts > 0])[::-1] for counts in _domain_counts(_grid_keys(grids), topology)]
+
+
+def get_batch_average_cultural_distance(grids, topology=None):
+    """
+    Average cultural distance between neighboring pairs of every grid in a stack
+
+    Args:
+        grids: numpy array of shape (R, grid_size, grid_size, F)
+        topology: Optional Topology of the grid agents
+            (default: open von Neumann lattice)
+
+    Returns:
+        float array of shape (R,)
+    """
+    differing, num_edges = _differing_features(grids, topology)
+    return _average_distance(differing, num_edges, grids.shape[3])
+
+
+# Metric registry
+# Every entry is name -> (function, requires, is_metric). A function is
+# called as function(grids, topology, *values of requires) on a stack of
+# final grids of shape (R, grid_size, grid_size, F) and returns one value
+# per replica. Entries that are not metrics are shared intermediates: they
+# are computed at most once per evaluation, and only if a requested metric
+# needs them.
+_REGISTRY = {}
+
+
+def register_metric(name, requires=(), intermediate=False):
+    """
+    Decorator adding a metric (or shared intermediate) to the registry
+
+    Args:
+        name: Metric name, used as the result column
+        requires: Names of registered entries the function takes as
+            additional arguments, in order
+        intermediate: True for shared values that are not reported
+    """
+    def decorator(function):
+        missing = [dependency for dependency in requires if dependency not in _REGISTRY]
+        if missing:
+            raise ValueError(f"Metric '{name}' requires unknown entries {missing}")
+        _REGISTRY[name] = (function, tuple(requires), not intermediate)
+        return function
+    return decorator
+
+
+@register_metric('culture_keys', intermediate=True)
+def _culture_keys_entry(grids, topology):
+    return _grid_keys(grids)
+
+
+@register_metric('domain_counts', requires=('culture_keys',), intermediate=True)
+def _domain_counts_entry(grids, topology, keys):
+    return _domain_counts(keys, topology)
+
+
+@register_metric('differing_features', intermediate=True)
+def _differing_features_entry(grids, topology):
+    return _differing_features(grids, topology)
+
+
+@register_metric('unique_cultures', requires=('culture_keys',))
+def _unique_cultures_entry(grids, topology, keys):
+    return _count_unique(keys)
+
+
+@register_metric('num_domains', requires=('domain_counts',))
+def _num_domains_entry(grids, topology, domain_counts):
+    return np.count_nonzero(domain_counts, axis=1)
+
+
+@register_metric('largest_domain_size', requires=('domain_counts',))
+def _largest_domain_size_entry(grids, topology, domain_counts):
+    return domain_counts.max(axis=1)
+
+
+@register_metric('largest_domain_percentage', requires=('largest_domain_size',))
+def _largest_domain_percentage_entry(grids, topology, largest_domain_size):
+    return (largest_domain_size / (grids.shape[1] * grids.shape[2])) * 100
+
+
+@register_metric('avg_cultural_distance', requires=('differing_features',))
+def _avg_cultural_distance_entry(grids, topology, differing_features):
+    differing, num_edges = differing_features
+    return _average_distance(differing, num_edges, grids.shape[3])
+
+
+@register_metric('global_consensus')
+def _global_consensus_entry(grids, topology):
+    # 1 if every agent has the first agent's culture, without culture keys
+    return (grids == grids[:, :1, :1]).all(axis=(1, 2, 3)).astype(np.int64)
+
+
+# Metrics reported when a sweep does not select any (steps_to_convergence
+# is always included)
+DEFAULT_METRICS = ('unique_cultures', 'num_domains', 'largest_domain_size',
+                   'largest_domain_percentage', 'avg_cultural_distance')
+
+
+def available_metrics():
+    """
+    Names of all registered metrics
+
+    Returns:
+        List of metric names in registration order
+    """
+    return [name for name, (_, _, is_metric) in _REGISTRY.items() if is_metric]
+
+
+def _evaluate(names, grids, topology):
+    """
+    Evaluate registry entries, each one and each dependency at most once
+
+    Returns:
+        Dictionary name -> value for the requested names
+    """
+    values = {}
+
+    def resolve(name):
+        if name not in values:
+            function, requires, _ = _REGISTRY[name]
+            values[name] = function(grids, topology, *[resolve(dependency) for dependency in requires])
+        return values[name]
+
+    return {name: resolve(name) for name in names}
+
+
+def _selected_metrics(metrics):
+    """Validate a metric selection, None selects DEFAULT_METRICS"""
+    if metrics is None:
+        return list(DEFAULT_METRICS)
+
+    # steps_to_convergence is always reported, selecting it is allowed
+    unknown = [name for name in metrics if name not in available_metrics() and name != 'steps_to_convergence']
+    if unknown:
+        raise ValueError(f"Unknown metrics {unknown}, available: {available_metrics()}")
+    return [name for name in metrics if name != 'steps_to_convergence']
+
+
+def calculate_batch_metrics(grids, steps_to_convergence, topology=None, metrics=None):
+    """
+    Calculate the selected metrics for a stack of simulation runs in one pass
+
+    Values match calculate_all_metrics applied to every grid of the stack.
+
+    Args:
+        grids: Final grid states, numpy array of shape (R, grid_size, grid_size, F)
+        steps_to_convergence: Sequence of R step counts
+        topology: Optional Topology used for neighbor distances and domains
+            (default: open von Neumann lattice)
+        metrics: Names of the metrics to compute (default: DEFAULT_METRICS)
+
+    Returns:
+        Dictionary with one array of shape (R,) per metric
+    """
+    grids = np.asarray(grids)
+    results = {'steps_to_convergence': np.asarray(steps_to_convergence)}
+    results.update(_evaluate(_selected_metrics(metrics), grids, topology))
+    return results
+
+
+def calculate_all_metrics(grid, steps_to_convergence, topology=None, metrics=None):
+    """
+    Calculate the selected metrics for a simulation run
+
+    Args:
+        grid: Final grid state (numpy array)
+        steps_to_convergence: Number of steps taken
+        topology: Optional Topology used for neighbor distances and domains
+            (default: open von Neumann lattice)
+        metrics: Names of the metrics to compute (default: DEFAULT_METRICS)
+
+    Returns:
+        Dictionary with all metrics
+    """
+    results = calculate_batch_metrics(grid[None], [steps_to_convergence], topology, metrics)
+    metrics = split_batch_metrics(results)[0]
+
+    # Keep the caller's step count object (e.g. a plain int) as is
+    metrics['steps_to_convergence'] = steps_to_convergence
+    return metrics
+
+
+def split_batch_metrics(batch_metrics):
+    """
+    Turn the arrays of calculate_batch_metrics into one dictionary per run
+
+    Values are plain Python numbers, as returned by calculate_all_metrics.
+
+    Returns:
+        List of R metric dictionaries
+    """
+    columns = {name: values.tolist() for name, values in batch_metrics.items()}
+    num_runs = len(next(iter(columns.values())))
+    return [{name: values[r] for name, values in columns.items()} for r in range(num_runs)]
@@ -0,0 +1,154 @@
+"""
+Incremental in-run observables for the Axelrod engine
+
+A CultureTable interns every distinct culture vector into a small integer id
+and keeps a live count of the agents holding it. The engine reports each
+adoption (one agent, one feature) to the table, which updates the agent's
+culture code arithmetically and moves the agent between two counts, so the
+number of unique cultures and the largest culture share can be read in O(1)
+at any step instead of with a full-grid pass.
+"""
+import numpy as np
+from .culture import can_pack, pack_cultures
+
+
+class CultureTable:
+    """
+    Interning table of the cultures present on a grid, with live counts
+
+    Culture codes are base-num_states integers as in culture.pack_cultures
+    (Python ints, so any number of features fits). Ids are handed out in
+    order of first appearance and never reused, so an id keeps naming the
+    same culture for the whole run.
+
+    Attributes:
+        num_cultures: Number of distinct cultures currently held by some agent
+        largest_count: Number of agents holding the most common culture
+    """
+
+    def __init__(self, agents, num_states):
+        """
+        Intern the cultures of the initial grid
+
+        Args:
+            agents: (num_agents, num_features) trait array
+            num_states: Base of the culture codes (largest number of states)
+        """
+        num_agents, num_features = agents.shape
+        self.num_agents = num_agents
+        self.num_states = num_states
+
+        # Place value of each feature in the code
+        self._weights = [num_states ** (num_features - 1 - f) for f in range(num_features)]
+
+        if can_pack(num_features, num_states):
+            codes = pack_cultures(agents, num_states).tolist()
+        else:
+            codes = np.zeros(num_agents, dtype=object)
+            for f in range(num_features):
+                codes = codes * num_states + agents[:, f].astype(object)
+            codes = codes.tolist()
+
+        self._agent_codes = codes
+        self._ids = {}
+        self._codes = []
+        self._counts = []
+        for code in codes:
+            self._counts[self._intern(code)] += 1
+
+        # Number of cultures with each count, to keep the maximum in O(1)
+        self._count_frequency = [0] * (num_agents + 1)
+        for count in self._counts:
+            self._count_frequency[count] += 1
+
+        self.num_cultures = len(self._codes)
+        self.largest_count = max(self._counts) if self._counts else 0
+
+    def _intern(self, code):
+        """Id of a culture code, assigning a new one on first sight"""
+        culture_id = self._ids.get(code)
+        if culture_id is None:
+            culture_id = self._ids[code] = len(self._codes)
+            self._codes.append(code)
+            self._counts.append(0)
+        return culture_id
+
+    def update(self, agent, feature, old_value, new_value):
+        """
+        Record that an agent changed one feature from old_value to new_value
+
+        Args:
+            agent: Flat agent index
+            feature: Feature index
+            old_value, new_value: Trait value before and after the change
+        """
+        old_code = self._agent_codes[agent]
+        new_code = old_code + (new_value - old_value) * self._weights[feature]
+        self._agent_codes[agent] = new_code
+
+        counts = self._counts
+        frequency = self._count_frequency
+
+        # Leave the old culture
+        old_id = self._ids[old_code]
+        count = counts[old_id]
+        frequency[count] -= 1
+        frequency[count - 1] += 1
+        counts[old_id] = count - 1
+        if count == 1:
+            self.num_cultures -= 1
+        if count == self.largest_count and frequency[count] == 0:
+            self.largest_count = count - 1
+
+        # Join the new culture
+        new_id = self._intern(new_code)
+        count = counts[new_id]
+        frequency[count] -= 1
+        frequency[count + 1] += 1
+        counts[new_id] = count + 1
+        if count == 0:
+            self.num_cultures += 1
+        if count + 1 > self.largest_count:
+            self.largest_count = count + 1
+
+    def largest_share(self):
+        """
+        Fraction of agents holding the most common culture
+
+        Returns:
+            Share between 0 and 1
+        """
+        return self.largest_count / self.num_agents
+
+    def culture_id(self, agent):
+        """
+        Interned id of an agent's current culture
+
+        Args:
+            agent: Flat agent index
+
+        Returns:
+            Culture id
+        """
+        return self._ids[self._agent_codes[agent]]
+
+    def count(self, culture_id):
+        """
+        Number of agents currently holding a culture
+
+        Args:
+            culture_id: Id from culture_id()
+
+        Returns:
+            Agent count (0 if the culture died out)
+        """
+        return self._counts[culture_id]
+
+    def code(self, culture_id):
+        """
+        Culture code of an interned id (see culture.unpack_cultures)
+
+        Returns:
+            Base-num_states culture code as a Python int
+        """
+        return self._codes[culture_id]
@@ -0,0 +1,209 @@
+"""
+Time-series recording of in-run observables
+
+A TimeSeriesRecorder samples the engine observables (unique cultures,
+largest culture share, active-bond fraction) at a fixed schedule of steps
+into preallocated arrays, optionally with full-grid snapshots written to a
+memory-mapped .npy file. Between samples the run loops only compare their
+step counter with the next scheduled step, so a sparse schedule costs one
+integer comparison per step and a run without a recorder costs nothing.
+"""
+import numpy as np
+
+# Schedule spacings accepted by sample_steps
+SPACINGS = ('linear', 'log')
+
+# Next-sample step once the schedule is exhausted (never reached)
+NEVER = 2**63 - 1
+
+
+def sample_steps(max_steps, num_samples, spacing='log'):
+    """
+    Steps at which to sample a run
+
+    Args:
+        max_steps: Last step of the schedule (the run's max_steps)
+        num_samples: Number of samples; log spacing can return fewer when
+            early steps round to the same integer
+        spacing: 'linear' (equal intervals) or 'log' (step 0, then equal
+            ratios from step 1, resolving the fast early coarsening)
+
+    Returns:
+        Sorted int64 array of distinct steps, starting at 0
+    """
+    if spacing not in SPACINGS:
+        raise ValueError(f"Unknown spacing '{spacing}', expected one of {SPACINGS}")
+    if num_samples < 1:
+        raise ValueError(f"num_samples must be at least 1, got {num_samples}")
+
+    if spacing == 'linear':
+        steps = np.linspace(0, max_steps, num_samples)
+    else:
+        steps = np.concatenate(([0], np.geomspace(1, max(max_steps, 1), num_samples - 1)))
+    return np.unique(np.rint(steps).astype(np.int64))
+
+
+class TimeSeriesRecorder:
+    """
+    Ring buffer of observables sampled at scheduled steps
+
+    The sample for step s holds the state after s steps. The buffers keep the
+    latest `capacity` samples; with the default capacity every scheduled
+    sample fits. Once a run is absorbed its state no longer changes, so the
+    rest of the schedule is filled with the final state and every absorbed
+    run yields the same sample steps (convenient for averaging over runs).
+
+    Attributes:
+        num_samples: Number of samples recorded in the current run (can
+            exceed capacity, older samples are then overwritten)
+        snapshot_count: Number of grid snapshots written in the current run
+    """
+
+    def __init__(self, schedule, capacity=None, snapshot_path=None, snapshot_every=1):
+        """
+        Args:
+            schedule: Steps to sample at (see sample_steps)
+            capacity: Number of samples kept (default: the whole schedule)
+            snapshot_path: Optional .npy file for full-grid snapshots,
+                memory-mapped with shape (num_snapshots, grid_size,
+                grid_size, num_features); None records no snapshots
+            snapshot_every: Snapshot the grid at every this-many-th
+                scheduled sample
+        """
+        self.schedule = np.unique(np.asarray(schedule, dtype=np.int64))
+        self.capacity = len(self.schedule) if capacity is None else int(capacity)
+        if self.capacity < 1:
+            raise ValueError(f"capacity must be at least 1, got {self.capacity}")
+        if snapshot_every < 1:
+            raise ValueError(f"snapshot_every must be at least 1, got {snapshot_every}")
+
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+
+        self.steps = np.zeros(self.capacity, dtype=np.int64)
+        self.unique_cultures = np.zeros(self.capacity, dtype=np.int64)
+        self.largest_culture_share = np.zeros(self.capacity)
+        self.active_bond_fraction = np.zeros(self.capacity)
+
+        self.snapshots = None
+        self.snapshot_steps = np.zeros(len(range(0, len(self.schedule), snapshot_every)), dtype=np.int64)
+        self.num_samples = 0
+        self.snapshot_count = 0
+        self._next = 0
+
+    @property
+    def next_step(self):
+        """Next scheduled step, NEVER when the schedule is exhausted"""
+        if self._next < len(self.schedule):
+            return int(self.schedule[self._next])
+        return NEVER
+
+    def start(self, model):
+        """
+        Reset the buffers for a new run of a model
+
+        Args:
+            model: AxelrodEngine about to run (needs track_cultures=True)
+
+        Returns:
+            First scheduled step
+        """
+        self.num_samples = 0
+        self.snapshot_count = 0
+        self._next = 0
+
+        if self.snapshot_path is not None:
+            self.snapshots = np.lib.format.open_memmap(
+                self.snapshot_path, mode='w+', dtype=model.grid.dtype,
+                shape=(len(self.snapshot_steps),) + model.grid.shape
+            )
+
+        return self.next_step
+
+    def record(self, model, last_step):
+        """
+        Record the current state for every scheduled step up to last_step
+
+        The run loops call this once their step counter reaches next_step;
+        last_step is the last step at which the current state still holds.
+
+        Args:
+            model: Running AxelrodEngine
+            last_step: Last step with the model's current state
+
+        Returns:
+            Next scheduled step after last_step (NEVER when exhausted)
+        """
+        schedule = self.schedule
+        if self._next >= len(schedule) or schedule[self._next] > last_step:
+            return self.next_step
+
+        observables = model.get_observables()
+        while self._next < len(schedule) and schedule[self._next] <= last_step:
+            slot = self.num_samples % self.capacity
+            self.steps[slot] = schedule[self._next]
+            self.unique_cultures[slot] = observables['unique_cultures']
+            self.largest_culture_share[slot] = observables['largest_culture_share']
+            self.active_bond_fraction[slot] = observables['active_bond_fraction']
+
+            if self.snapshots is not None and self._next % self.snapshot_every == 0:
+                self.snapshots[self.snapshot_count] = model.grid
+                self.snapshot_steps[self.snapshot_count] = schedule[self._next]
+                self.snapshot_count += 1
+
+            self.num_samples += 1
+            self._next += 1
+
+        return self.next_step
+
+    def finish(self, model):
+        """
+        Record the end of a run and flush the snapshot file
+
+        Args:
+            model: AxelrodEngine that finished run()
+        """
+        # An absorbed state holds for every later step
+        self.record(model, NEVER if model.is_absorbing_state() else model.step_count)
+
+        if self.snapshots is not None:
+            self.snapshots.flush()
+
+    def series(self):
+        """
+        Recorded samples in step order
+
+        Returns:
+            Dictionary of equal-length arrays: step, unique_cultures,
+            largest_culture_share, active_bond_fraction
+        """
+        count = min(self.num_samples, self.capacity)
+        # Oldest kept sample first once the ring buffer has wrapped
+        order = (np.arange(count) + self.num_samples - count) % self.capacity
+
+        return {
+            'step': self.steps[order],
+            'unique_cultures': self.unique_cultures[order],
+            'largest_culture_share': self.largest_culture_share[order],
+            'active_bond_fraction': self.active_bond_fraction[order]
+        }
+
+    def rows(self, **labels):
+        """
+        Recorded samples as one dictionary per sample, for CSV output
+
+        Args:
+            **labels: Columns prepended to every row (e.g. F, q, run_id)
+
+        Returns:
+            List of dictionaries
+        """
+        series = self.series()
+        return [
+            {**labels, 'step': int(step), 'unique_cultures': int(unique),
+             'largest_culture_share': float(largest), 'active_bond_fraction': float(active)}
+            for step, unique, largest, active in zip(
+                series['step'], series['unique_cultures'],
+                series['largest_culture_share'], series['active_bond_fraction']
+            )
+        ]
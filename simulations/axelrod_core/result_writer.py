@@ -0,0 +1,107 @@
+"""
+Append-only CSV output of sweep results
+
+A ResultWriter appends each batch of results to its file as soon as the
+batch arrives, instead of rewriting all results collected so far. Each batch
+is written as whole rows and flushed, so the file is a valid CSV (header plus
+complete rows) whenever a batch is not being written, and can be read while
+the sweep is still running. Flushed rows survive a crash of the sweep; they
+are forced to disk with fsync once sync_seconds have passed or sync_bytes
+have been written since the last sync, which bounds both the fsync cost and
+what a system crash can lose.
+"""
+import csv
+import io
+import os
+import time
+
+
+class ResultWriter:
+    """
+    Append-only CSV writer of result dictionaries
+
+    The file is created (replacing an older one) at the first non-empty
+    batch, with a header from the keys of its first row; every later row must
+    have the same keys.
+
+    Attributes:
+        num_rows: Number of rows written so far
+    """
+
+    def __init__(self, filename, sync_seconds=10.0, sync_bytes=1 << 20):
+        """
+        Args:
+            filename: Output CSV file
+            sync_seconds: Longest time between fsyncs of written rows
+            sync_bytes: Largest amount of text written between fsyncs
+        """
+        self.filename = filename
+        self.sync_seconds = sync_seconds
+        self.sync_bytes = sync_bytes
+        self.num_rows = 0
+
+        self._file = None
+        self._writer = None
+        self._buffer = io.StringIO()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def write(self, rows):
+        """
+        Append a batch of rows
+
+        Args:
+            rows: List of result dictionaries
+
+        Returns:
+            True if the batch was also forced to disk
+        """
+        if not rows:
+            return False
+
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.filename) or '.', exist_ok=True)
+            self._file = open(self.filename, 'w', newline='')
+            self._writer = csv.DictWriter(self._buffer, fieldnames=list(rows[0].keys()))
+            self._writer.writeheader()
+
+        # Format the whole batch first so the file only ever grows by complete rows
+        self._writer.writerows(rows)
+        text = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+        self._file.write(text)
+        self._file.flush()
+        self.num_rows += len(rows)
+        self._unsynced += len(text)
+
+        if self._unsynced >= self.sync_bytes or time.monotonic() - self._last_sync >= self.sync_seconds:
+            self.sync()
+            return True
+        return False
+
+    def sync(self):
+        """Force all written rows to disk"""
+        if self._file is None:
+            return
+
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        """Sync and close the file"""
+        if self._file is None:
+            return
+
+        self.sync()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
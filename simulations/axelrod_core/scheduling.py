@@ -0,0 +1,91 @@
+"""
+Longest-job-first ordering of sweep tasks
+
+Run times across a sweep differ by orders of magnitude, and a sweep that
+starts its longest runs last ends with most cores idle. The predicted cost of
+a run is the mean steps_to_convergence of its parameter values in an earlier
+raw_data.csv. Values without history fall back to a parametric prior of the
+study, scaled to the history where both exist. Tasks are then dispatched in
+order of decreasing predicted cost.
+"""
+import csv
+import os
+
+import numpy as np
+
+
+def historical_costs(filename, key_columns, cost_column='steps_to_convergence'):
+    """
+    Mean cost per parameter key from an earlier raw data file
+
+    Args:
+        filename: raw_data.csv of a previous sweep
+        key_columns: Columns that identify the parameter values of a run
+        cost_column: Column with the cost of one run
+
+    Returns:
+        Dictionary mapping key tuples (values as floats) to the mean cost;
+        empty if the file does not exist or lacks a column
+    """
+    if not os.path.exists(filename):
+        return {}
+
+    totals = {}
+    with open(filename, newline='') as csvfile:
+        reader = csv.DictReader(csvfile)
+        if reader.fieldnames is None or not set(key_columns) | {cost_column} <= set(reader.fieldnames):
+            return {}
+
+        for row in reader:
+            try:
+                key = tuple(float(row[column]) for column in key_columns)
+                cost = float(row[cost_column])
+            except ValueError:
+                continue  # Incomplete row, e.g. from an interrupted save
+            total, count = totals.get(key, (0.0, 0))
+            totals[key] = (total + cost, count + 1)
+
+    return {key: total / count for key, (total, count) in totals.items()}
+
+
+def predict_costs(keys, history, prior):
+    """
+    Predicted cost of one run for each parameter key
+
+    Args:
+        keys: List of key tuples (as in historical_costs)
+        history: Dictionary of mean costs from historical_costs()
+        prior: Function of a key returning a relative cost estimate
+
+    Returns:
+        float array with one predicted cost per key
+    """
+    priors = np.array([prior(key) for key in keys], dtype=float)
+    known = np.array([key in history for key in keys])
+    if not known.any():
+        return priors
+
+    costs = priors.copy()
+    costs[known] = [history[key] for key, is_known in zip(keys, known) if is_known]
+
+    # Bring the prior to the units of the history: median ratio of the keys with both
+    ratios = costs[known] / np.maximum(priors[known], 1e-300)
+    costs[~known] = priors[~known] * np.median(ratios)
+    return costs
+
+
+def longest_first(tasks, costs):
+    """
+    Order tasks by decreasing predicted cost
+
+    The sort is stable, so tasks of equal cost keep their sweep order.
+
+    Args:
+        tasks: List of tasks
+        costs: Predicted cost of every task
+
+    Returns:
+        List of the same tasks, most expensive first
+    """
+    order = np.argsort(-np.asarray(costs, dtype=float), kind='stable')
+    return [tasks[idx] for idx in order]
@@ -0,0 +1,217 @@
+"""
+Neighbor structures (topologies) for Axelrod model simulations
+
+A Topology stores who interacts with whom as flat CSR index arrays, computed
+once and shared by the models and metrics:
+    offsets[a]:offsets[a + 1]  -> slice of agent a's neighbors
+    neighbor_ids[k]            -> neighbor agent index
+    neighbor_edges[k]          -> undirected edge id of that neighbor pair
+    degree[a]                  -> number of neighbors of agent a
+    edges[e]                   -> (a, b) agent indices of edge e, a < b
+
+Agents on a grid are indexed as i * grid_size + j.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+
+class Topology:
+    """
+    Undirected neighbor structure in CSR form
+    """
+
+    def __init__(self, neighbor_lists, name='graph'):
+        """
+        Build the CSR tables from per-agent neighbor lists
+
+        Args:
+            neighbor_lists: List with, for every agent, the list of its
+                neighbor indices (order is kept; it defines which neighbor a
+                random slot selects)
+            name: Human readable description
+
+        Raises:
+            ValueError: If the neighbor lists are not a simple undirected graph
+        """
+        self.name = name
+        self.num_agents = len(neighbor_lists)
+
+        degree = np.array([len(neighbors) for neighbors in neighbor_lists], dtype=np.int64)
+        neighbor_ids = np.fromiter(
+            (neighbor for neighbors in neighbor_lists for neighbor in neighbors),
+            dtype=np.int64, count=int(degree.sum())
+        )
+        self._build(degree, neighbor_ids)
+
+    @classmethod
+    def from_padded(cls, neighbors, name='graph'):
+        """
+        Build the CSR tables from a rectangular neighbor table
+
+        Vectorized alternative to the constructor for large graphs
+
+        Args:
+            neighbors: int array of shape (num_agents, max_degree) with the
+                neighbor indices of every agent, padded with -1
+            name: Human readable description
+
+        Raises:
+            ValueError: If the table is not a simple undirected graph
+        """
+        neighbors = np.asarray(neighbors, dtype=np.int64)
+        topology = cls.__new__(cls)
+        topology.name = name
+        topology.num_agents = len(neighbors)
+        valid = neighbors >= 0
+        topology._build(np.count_nonzero(valid, axis=1).astype(np.int64), neighbors[valid])
+        return topology
+
+    def _build(self, degree, neighbor_ids):
+        """
+        Derive edges and edge ids from the flat neighbor ids, vectorized
+
+        Edge ids follow the order in which pairs first appear when scanning
+        agents in index order (each pair first appears at its smaller agent).
+
+        Args:
+            degree: (num_agents,) number of neighbors per agent
+            neighbor_ids: Neighbor indices of all agents, concatenated
+        """
+        num_agents = self.num_agents
+        offsets = np.zeros(num_agents + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum(degree)
+        agents = np.repeat(np.arange(num_agents, dtype=np.int64), degree)
+
+        invalid = (neighbor_ids == agents) | (neighbor_ids < 0) | (neighbor_ids >= num_agents)
+        if invalid.any():
+            k = int(np.argmax(invalid))
+            raise ValueError(f"Invalid neighbor {neighbor_ids[k]} for agent {agents[k]}")
+
+        directed = np.sort(agents * num_agents + neighbor_ids)
+        repeated = directed[1:] == directed[:-1]
+        if repeated.any():
+            raise ValueError(f"Agent {directed[np.argmax(repeated)] // num_agents} lists the same neighbor twice")
+
+        # Undirected pair key; every pair has to be listed from both sides,
+        # the first time (from its smaller agent) defines the edge
+        pair_keys = np.minimum(agents, neighbor_ids) * num_agents + np.maximum(agents, neighbor_ids)
+        forward = agents < neighbor_ids
+        edge_keys = pair_keys[forward]
+        order = np.argsort(edge_keys, kind='stable')
+        position = np.minimum(np.searchsorted(edge_keys, pair_keys, sorter=order), max(len(order) - 1, 0))
+        if 2 * len(edge_keys) != len(pair_keys) or \
+                (len(order) > 0 and not np.array_equal(edge_keys[order[position]], pair_keys)):
+            raise ValueError("Neighbor lists are not symmetric")
+
+        neighbor_edges = order[position] if len(order) > 0 else np.zeros(0, dtype=np.int64)
+        edges = np.stack([agents[forward], neighbor_ids[forward]], axis=1)
+
+        self.offsets = offsets
+        self.degree = degree
+        self.neighbor_ids = neighbor_ids
+        self.neighbor_edges = neighbor_edges.astype(np.int64)
+        self.edges = edges.reshape(-1, 2)
+        self.num_edges = len(edges)
+        self.max_degree = int(degree.max()) if len(degree) else 0
+
+        # Topologies are shared between models, keep the tables read-only
+        for array in (self.offsets, self.degree, self.neighbor_ids,
+                      self.neighbor_edges, self.edges):
+            array.flags.writeable = False
+
+        self._padded = None
+
+    def __repr__(self):
+        return f"Topology({self.name}, agents={self.num_agents}, edges={self.num_edges})"
+
+    def neighbors_of(self, agent):
+        """
+        Get the neighbors of one agent
+
+        Returns:
+            Read-only array of neighbor agent indices
+        """
+        return self.neighbor_ids[self.offsets[agent]:self.offsets[agent + 1]]
+
+    def padded(self):
+        """
+        Get rectangular neighbor tables for vectorized code
+
+        Returns:
+            Tuple (neighbors, edges) of int arrays with shape
+            (num_agents, max_degree), padded with -1
+        """
+        if self._padded is None:
+            neighbors = np.full((self.num_agents, self.max_degree), -1, dtype=np.int64)
+            edges = np.full((self.num_agents, self.max_degree), -1, dtype=np.int64)
+            slots = np.arange(len(self.neighbor_ids)) - np.repeat(self.offsets[:-1], self.degree)
+            rows = np.repeat(np.arange(self.num_agents), self.degree)
+            neighbors[rows, slots] = self.neighbor_ids
+            edges[rows, slots] = self.neighbor_edges
+            neighbors.flags.writeable = False
+            edges.flags.writeable = False
+            self._padded = (neighbors, edges)
+
+        return self._padded
+
+
+@lru_cache(maxsize=None)
+def lattice_topology(grid_size, periodic=False, moore=False):
+    """
+    Square lattice topology, computed once per configuration
+
+    Neighbor order is up, down, left, right (then up-left, up-right,
+    down-left, down-right for the Moore neighborhood).
+
+    Args:
+        grid_size: Size of the square grid (grid_size x grid_size)
+        periodic: Wrap around the borders (torus) instead of an open lattice
+        moore: Use the 8-cell Moore neighborhood instead of von Neumann
+
+    Returns:
+        Topology instance
+    """
+    if periodic and grid_size < 3:
+        raise ValueError("A periodic lattice needs grid_size >= 3")
+
+    offsets = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if moore:
+        offsets += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+    i, j = np.divmod(np.arange(grid_size * grid_size, dtype=np.int64), grid_size)
+    neighbors = np.full((grid_size * grid_size, len(offsets)), -1, dtype=np.int64)
+    for slot, (di, dj) in enumerate(offsets):
+        ni, nj = i + di, j + dj
+        if periodic:
+            ni %= grid_size
+            nj %= grid_size
+        inside = (ni >= 0) & (ni < grid_size) & (nj >= 0) & (nj < grid_size)
+        neighbors[inside, slot] = ni[inside] * grid_size + nj[inside]
+
+    # Open borders leave -1 gaps; shift each row's neighbors to the front
+    # so the neighbor order stays up, down, left, right, ...
+    neighbors = np.take_along_axis(neighbors, np.argsort(neighbors < 0, axis=1, kind='stable'), axis=1)
+
+    name = f"{grid_size}x{grid_size} {'torus' if periodic else 'open lattice'}, " \
+           f"{'Moore' if moore else 'von Neumann'}"
+    return Topology.from_padded(neighbors, name=name)
+
+
+def graph_topology(num_agents, edges):
+    """
+    Topology of an arbitrary undirected graph
+
+    Args:
+        num_agents: Number of agents (nodes)
+        edges: Iterable of (a, b) agent index pairs
+
+    Returns:
+        Topology instance
+    """
+    neighbor_lists = [[] for _ in range(num_agents)]
+    for a, b in edges:
+        neighbor_lists[a].append(b)
+        neighbor_lists[b].append(a)
+
+    return Topology(neighbor_lists, name=f"graph with {num_agents} agents")
@@ -0,0 +1,78 @@
+"""
+Transition rules for the Axelrod engine
+
+A transition rule fixes what happens when a selected pair of neighbors can
+interact: whether they interact with probability shared / F or always, and
+whether the receiver copies the dominator's state of the chosen feature
+(nominal feature) or moves one state toward it (ordered feature).
+"""
+import numpy as np
+
+
+class TransitionRule:
+    """
+    Per-feature adoption rule and interaction probability
+
+    Attributes:
+        num_features: Number of features
+        ordered: (num_features,) bool array, True for features that move one
+            state toward the dominator instead of copying it
+        weighted: Interact with probability shared / num_features instead of
+            always
+    """
+
+    def __init__(self, ordered, weighted=False):
+        """
+        Create a transition rule
+
+        Args:
+            ordered: Sequence of bools, one per feature, True for one-step
+                (ordered) features
+            weighted: Interact with probability shared / num_features
+        """
+        self.ordered = np.array(ordered, dtype=bool).reshape(-1)
+        if len(self.ordered) == 0:
+            raise ValueError("At least one feature is required")
+        self.ordered.flags.writeable = False
+
+        self.num_features = len(self.ordered)
+        self.weighted = bool(weighted)
+
+    @classmethod
+    def full_adoption(cls, num_features, weighted=False):
+        """Classic Axelrod rule: every feature is copied from the dominator"""
+        return cls(np.zeros(num_features, dtype=bool), weighted)
+
+    @classmethod
+    def ordered_one_step(cls, num_features, weighted=False):
+        """Every feature moves one state toward the dominator"""
+        return cls(np.ones(num_features, dtype=bool), weighted)
+
+    @classmethod
+    def mixed(cls, has_order, weighted=False):
+        """
+        Per-feature rule: ordered features move one step, the others are copied
+
+        Args:
+            has_order: Sequence of bools, one per feature (e.g. FeatureSchema.has_order)
+            weighted: Interact with probability shared / num_features
+        """
+        return cls(has_order, weighted)
+
+    def interaction_weight(self, shared):
+        """
+        Probability that a selected active pair actually interacts
+
+        Args:
+            shared: Number of shared features of the pair
+
+        Returns:
+            shared / num_features for weighted rules, otherwise 1.0
+        """
+        if self.weighted:
+            return shared / self.num_features
+        return 1.0
+
+    def __repr__(self):
+        return (f"TransitionRule(features={self.num_features}, "
+                f"ordered={int(self.ordered.sum())}, weighted={self.weighted})")
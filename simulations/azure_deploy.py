@@ -24,6 +24,9 @@ from pathlib import Path
 
 import config_azure as config
 
+# Simulation package shared by all case studies, uploaded next to each study folder
+SHARED_PACKAGE = "axelrod_core"
+
 
 def print_banner(text):
     """Print formatted banner"""
@@ -208,7 +211,7 @@ def get_vm_ip(vm_name):
 
 def upload_simulation_code(vm_ip, case_study_folder):
     """
-    Upload simulation code to VM using SCP
+    Upload simulation code (study folder and shared package) to VM using SCP
 
     Args:
         vm_ip: IP address of VM
@@ -228,7 +231,9 @@ def upload_simulation_code(vm_ip, case_study_folder):
         "mkdir -p /home/azureuser/simulations"
     ], check=True, timeout=120)
 
+    # The study imports the shared package from the folder next to it
     local_path = Path(__file__).parent / case_study_folder
+    package_path = Path(__file__).parent / SHARED_PACKAGE
     remote_path = f"{config.ADMIN_USERNAME}@{vm_ip}:/home/azureuser/simulations/"
 
     # Remove existing folder on VM to avoid conflicts (ignore errors if doesn't exist)
@@ -241,7 +246,7 @@ def upload_simulation_code(vm_ip, case_study_folder):
             "-o", "ServerAliveInterval=10",
             "-o", "ServerAliveCountMax=3",
             f"{config.ADMIN_USERNAME}@{vm_ip}",
-            f"rm -rf /home/azureuser/simulations/{case_study_folder}"
+            f"rm -rf /home/azureuser/simulations/{case_study_folder} /home/azureuser/simulations/{SHARED_PACKAGE}"
         ], timeout=120)
     except subprocess.TimeoutExpired:
         print(f"  Warning: Cleanup timed out, continuing anyway...")
@@ -255,6 +260,7 @@ def upload_simulation_code(vm_ip, case_study_folder):
         "-o", "ServerAliveInterval=10",
         "-o", "ServerAliveCountMax=3",
         str(local_path),
+        str(package_path),
         remote_path
     ], check=True, timeout=600)
 